@@ -10,7 +10,7 @@ The orchestrator provides:
 
 import asyncio
 import logging
-from collections.abc import Awaitable, Callable
+from collections.abc import Awaitable, Callable, Iterable
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -100,6 +100,15 @@ class AgentRegistry:
             extra={"capabilities": metadata.capabilities},
         )
 
+    def register_many(self, metadata: Iterable[AgentMetadata]) -> None:
+        """Register several agents at once.
+
+        Args:
+            metadata: Metadata for each agent to register.
+        """
+        for item in metadata:
+            self.register(item)
+
     def unregister(self, name: str) -> None:
         """Unregister an agent.
 
@@ -13,7 +13,7 @@ import logging
 from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 from datetime import UTC
-from typing import Any, Literal
+from typing import Any, ClassVar, Literal
 
 from pydantic import BaseModel, Field, ValidationError
 from sqlalchemy import or_, select
@@ -221,10 +221,23 @@ class ToolValidationError(Exception):
 class ToolManager:
     """Manager for tool registration, validation, and execution."""
 
+    # Built-in tool metadata, registered by the first manager of each class and
+    # copied by later ones. It is shared across instances, so built-in tool
+    # metadata must stay stateless.
+    _builtin_tools: ClassVar[dict[str, ToolMetadata] | None] = None
+
     def __init__(self) -> None:
         """Initialize the tool manager."""
-        self._tools: dict[str, ToolMetadata] = {}
-        self._register_builtin_tools()
+        cls = type(self)
+        # Read the class's own cache so a subclass that overrides built-in
+        # registration never picks up its parent's tools.
+        builtin_tools = cls.__dict__.get("_builtin_tools")
+        if builtin_tools is None:
+            self._tools: dict[str, ToolMetadata] = {}
+            self._register_builtin_tools()
+            cls._builtin_tools = dict(self._tools)
+        else:
+            self._tools = dict(builtin_tools)
 
     def _register_builtin_tools(self) -> None:
         """Register built-in tools."""
@@ -2,6 +2,7 @@
 
 import os
 from collections.abc import AsyncGenerator, Generator
+from typing import Any
 
 from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import (
@@ -10,6 +11,7 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from app.config import get_settings
 
@@ -23,6 +25,22 @@ class Base(DeclarativeBase):
     pass
 
 
+def _is_in_memory_sqlite(url: str) -> bool:
+    """Return True if the URL points at an in-memory SQLite database."""
+    return url.startswith("sqlite") and (":memory:" in url or "mode=memory" in url)
+
+
+def _pool_options(url: str) -> dict[str, Any]:
+    """Return pool options for the given database URL.
+
+    In-memory SQLite databases only live as long as a connection stays open,
+    so each engine keeps a single connection via StaticPool.
+    """
+    if _is_in_memory_sqlite(url):
+        return {"poolclass": StaticPool}
+    return {}
+
+
 # Convert sync URL to async URL
 async_database_url = database_url.replace(
     "sqlite://", "sqlite+aiosqlite://"
@@ -34,6 +52,7 @@ async_database_url = database_url.replace(
 async_engine = create_async_engine(
     async_database_url,
     echo=settings.debug,
+    **_pool_options(async_database_url),
 )
 
 # Create async session factory
@@ -49,6 +68,7 @@ engine = create_engine(
     database_url,
     connect_args={"check_same_thread": False} if database_url.startswith("sqlite") else {},
     echo=settings.debug,
+    **_pool_options(database_url),
 )
 
 # Create sync session factory (for backwards compatibility)
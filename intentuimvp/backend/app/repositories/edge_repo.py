@@ -116,6 +116,33 @@ class EdgeRepository(BaseRepository[Edge, Any, Any]):
         result = await self.db.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_by_nodes(self, node_ids: list[int]) -> list[Edge]:
+        """Get edges touching any of several nodes in a single query.
+
+        Args:
+            node_ids: Node identifiers
+
+        Returns:
+            List of edges where any given node is the source or target
+        """
+        if not node_ids:
+            return []
+
+        from sqlalchemy import or_
+
+        stmt = (
+            select(Edge)
+            .where(
+                or_(
+                    Edge.from_node_id.in_(node_ids),
+                    Edge.to_node_id.in_(node_ids),
+                )
+            )
+            .order_by(Edge.id)
+        )
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+
     async def create_edge(
         self,
         canvas_id: int,
@@ -23,6 +23,8 @@ class BackupEncryption:
     """
 
     _key: bytes | None = None
+    _fernet: Fernet | None = None
+    _fernet_key: bytes | None = None
 
     @classmethod
     def get_key(cls) -> bytes:
@@ -51,6 +53,22 @@ class BackupEncryption:
 
         return cls._key
 
+    @classmethod
+    def _get_fernet(cls) -> Fernet:
+        """Get the Fernet instance for the current key.
+
+        The instance is rebuilt only when ``_key`` changes, so repeated
+        encrypt/decrypt calls skip re-decoding and splitting the key.
+
+        Returns:
+            Fernet instance bound to the current encryption key
+        """
+        key = cls.get_key()
+        if cls._fernet is None or cls._fernet_key is not key:
+            cls._fernet = Fernet(key)
+            cls._fernet_key = key
+        return cls._fernet
+
     @classmethod
     def encrypt(cls, data: bytes | str) -> bytes:
         """Encrypt data using Fernet symmetric encryption.
@@ -67,8 +85,7 @@ class BackupEncryption:
         try:
             if isinstance(data, str):
                 data = data.encode("utf-8")
-            f = Fernet(cls.get_key())
-            return f.encrypt(data)
+            return cls._get_fernet().encrypt(data)
         except Exception as e:
             raise EncryptionError(f"Encryption failed: {e}")
 
@@ -86,8 +103,7 @@ class BackupEncryption:
             EncryptionError: If decryption fails or data is corrupted
         """
         try:
-            f = Fernet(cls.get_key())
-            return f.decrypt(encrypted_data)
+            return cls._get_fernet().decrypt(encrypted_data)
         except InvalidToken:
             raise EncryptionError("Decryption failed: Invalid token or corrupted data")
         except Exception as e:
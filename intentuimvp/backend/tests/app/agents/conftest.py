@@ -0,0 +1,128 @@
+"""Shared fixtures for agent tests."""
+
+import inspect
+import re
+from collections.abc import Callable
+from types import SimpleNamespace
+
+import pytest
+
+import app.agents.echo_agent as echo_module
+import app.agents.intent_decipherer as decipher_module
+from app.agents.echo_agent import EchoAgent, EchoResponse
+from app.agents.intent_decipherer import IntentDeciphererAgent
+
+
+async def _unconfigured_generate(*args, **kwargs) -> None:
+    """Default Gateway ``generate`` for tests that never set a response."""
+    return None
+
+
+def _async_return(value):
+    """Build a ``generate`` stand-in that returns ``value``."""
+
+    async def _generate(*args, **kwargs):
+        return value
+
+    return _generate
+
+
+def _async_raise(exc: Exception):
+    """Build a ``generate`` stand-in that raises ``exc``."""
+
+    async def _generate(*args, **kwargs):
+        raise exc
+
+    return _generate
+
+
+@pytest.fixture(scope="session")
+def async_return() -> Callable:
+    """Return the builder for ``generate`` stand-ins that return a value."""
+    return _async_return
+
+
+@pytest.fixture(scope="session")
+def async_raise() -> Callable:
+    """Return the builder for ``generate`` stand-ins that raise."""
+    return _async_raise
+
+
+@pytest.fixture(scope="session")
+def shared_gateway_mock() -> SimpleNamespace:
+    """Build a Gateway stand-in once per test session.
+
+    Agents only call ``generate``, so a plain namespace avoids the cost of
+    ``MagicMock(spec=GatewayClient)``. The spec contract is covered by
+    ``TestEchoAgent.test_gateway_mock_matches_client_contract``.
+    """
+    return SimpleNamespace(generate=_unconfigured_generate)
+
+
+@pytest.fixture
+def mock_gateway(
+    shared_gateway_mock: SimpleNamespace, monkeypatch: pytest.MonkeyPatch
+) -> SimpleNamespace:
+    """Return the shared Gateway stand-in.
+
+    Tests assign their own ``generate`` coroutine; ``monkeypatch`` restores the
+    default afterwards so responses never leak between tests.
+    """
+    monkeypatch.setattr(shared_gateway_mock, "generate", _unconfigured_generate)
+    return shared_gateway_mock
+
+
+@pytest.fixture(scope="session")
+def shared_echo_agent(shared_gateway_mock: SimpleNamespace) -> EchoAgent:
+    """Build one EchoAgent bound to the shared Gateway stand-in."""
+    return EchoAgent(gateway=shared_gateway_mock)
+
+
+@pytest.fixture
+def echo_agent(mock_gateway: SimpleNamespace, shared_echo_agent: EchoAgent) -> EchoAgent:
+    """Return the shared EchoAgent after the Gateway stand-in is reset."""
+    return shared_echo_agent
+
+
+@pytest.fixture(scope="session")
+def shared_decipherer_agent(
+    shared_gateway_mock: SimpleNamespace,
+) -> IntentDeciphererAgent:
+    """Build one default-configured IntentDeciphererAgent for the session."""
+    return IntentDeciphererAgent(gateway=shared_gateway_mock)
+
+
+@pytest.fixture
+def decipherer_agent(
+    mock_gateway: SimpleNamespace, shared_decipherer_agent: IntentDeciphererAgent
+) -> IntentDeciphererAgent:
+    """Return the shared IntentDeciphererAgent after the Gateway stand-in is reset."""
+    return shared_decipherer_agent
+
+
+@pytest.fixture(scope="session")
+def lowered_sources() -> dict[str, str]:
+    """Read and lowercase each agent module's source once per session."""
+    return {
+        "echo": inspect.getsource(echo_module).lower(),
+        "decipher": inspect.getsource(decipher_module).lower(),
+    }
+
+
+@pytest.fixture(scope="session")
+def forbidden_imports() -> re.Pattern[str]:
+    """Match direct provider SDK imports in lowercased module source."""
+    return re.compile(r"(?:import|from) (?:openai|anthropic)")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_echo_response_validator() -> None:
+    """Run one ``EchoResponse`` validation before the first agent test.
+
+    Pydantic builds the validator at class creation, but the first call still
+    pays one-off setup that would otherwise land on whichever test runs first.
+    """
+    EchoResponse.model_validate(
+        {"original": "", "echo": "", "timestamp": "2024-01-01T00:00:00"}
+    )
+
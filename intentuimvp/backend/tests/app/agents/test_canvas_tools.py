@@ -1,12 +1,20 @@
 """Tests for canvas tool implementations."""
 
-import uuid
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import secrets
 from collections.abc import AsyncGenerator
+from typing import TYPE_CHECKING, Any
 
 import pytest
 import pytest_asyncio
-from sqlalchemy import select
+from sqlalchemy import bindparam, lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+import app.agents.tools as tools_module
 from app.agents.tools import DEFAULT_USER_ID, ToolValidationError, get_tool_manager
 from app.database import AsyncSessionLocal, async_engine
 from app.models.edge import RelationType
@@ -15,12 +23,78 @@ from app.repositories.canvas_repo import CanvasRepository
 from app.repositories.edge_repo import EdgeRepository
 from app.repositories.node_repo import NodeRepository
 
+if TYPE_CHECKING:
+    from app.models.canvas import Canvas
+
+# Labels only need to be unique within the shared test database, so a per-run
+# prefix plus a counter is enough (INTENTUI_TEST_DATABASE_URL may persist rows).
+_RUN_PREFIX = secrets.token_hex(4)
+_token_counter = itertools.count()
+
+
+def _unique_token() -> str:
+    """Return a label suffix that is unique across tests in this run."""
+    return f"{_RUN_PREFIX}{next(_token_counter):08x}"
+
+
+# Statement templates built once and reused with bound parameters.
+_NODE_FIELDS_BY_ID = lambda_stmt(
+    lambda: select(Node.label, Node.type, Node.position, Node.node_metadata).where(
+        Node.id == bindparam("node_id")
+    )
+)
+_NODE_ID_BY_LABEL = lambda_stmt(
+    lambda: select(Node.id).where(Node.label == bindparam("label")).limit(1)
+)
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def module_canvas() -> Canvas:
+    """Create one parent canvas shared by the node and edge tool tests."""
+    async with AsyncSessionLocal() as session:
+        canvas = await CanvasRepository(session).create_canvas(
+            DEFAULT_USER_ID, name=f"tool-module-{_unique_token()}"
+        )
+    # Drop the pooled connection so it is not reused from another event loop.
+    await async_engine.dispose()
+    return canvas
+
+
+@pytest_asyncio.fixture
+async def db_session(
+    monkeypatch: pytest.MonkeyPatch,
+) -> AsyncGenerator[AsyncSession, None]:
+    """Yield a session whose writes are rolled back when the test ends.
+
+    Tool sessions are rebound to the same connection, so repository commits
+    only release SAVEPOINTs inside the outer transaction.
+    """
+    async with async_engine.connect() as connection:
+        transaction = await connection.begin()
+        if connection.dialect.name == "sqlite":
+            # pysqlite defers BEGIN until the first DML statement; start the
+            # transaction explicitly so SAVEPOINT/RELEASE nest inside it.
+            await connection.exec_driver_sql("BEGIN")
+
+        session_factory = async_sessionmaker(
+            bind=connection,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        monkeypatch.setattr(tools_module, "AsyncSessionLocal", session_factory)
+
+        async with session_factory() as session:
+            yield session
+
+        await transaction.rollback()
+
 
 @pytest.mark.asyncio
-async def test_canvas_create_node_tool_creates_node() -> None:
+async def test_canvas_create_node_tool_creates_node(db_session: AsyncSession) -> None:
     """Verify canvas.create_node persists a node and returns its ID."""
     manager = get_tool_manager()
-    label = f"tool-node-{uuid.uuid4().hex}"
+    label = f"tool-node-{_unique_token()}"
     result = await manager.execute_tool(
         "canvas.create_node",
         {
@@ -34,22 +108,23 @@ async def test_canvas_create_node_tool_creates_node() -> None:
     assert result.success
     node_id = result.output["id"]
 
-    async with AsyncSessionLocal() as session:
-        query = await session.execute(select(Node).where(Node.id == node_id))
-        node = query.scalar_one_or_none()
+    query = await db_session.execute(_NODE_FIELDS_BY_ID, {"node_id": node_id})
+    row = query.one_or_none()
 
-    assert node is not None
-    assert node.label == label
-    assert node.type == NodeType.TEXT
-    assert node.get_position() == {"x": 12.5, "y": 3.25, "z": 0.0}
-    assert node.get_metadata() == {"source": "tool-test"}
+    assert row is not None
+    assert row.label == label
+    assert row.type == NodeType.TEXT
+    assert json.loads(row.position) == {"x": 12.5, "y": 3.25, "z": 0.0}
+    assert json.loads(row.node_metadata) == {"source": "tool-test"}
 
 
 @pytest.mark.asyncio
-async def test_canvas_create_node_tool_rejects_invalid_type() -> None:
+async def test_canvas_create_node_tool_rejects_invalid_type(
+    db_session: AsyncSession,
+) -> None:
     """Verify invalid payloads are rejected without node creation."""
     manager = get_tool_manager()
-    label = f"invalid-node-{uuid.uuid4().hex}"
+    label = f"invalid-node-{_unique_token()}"
 
     with pytest.raises(ToolValidationError):
         await manager.execute_tool(
@@ -61,133 +136,93 @@ async def test_canvas_create_node_tool_rejects_invalid_type() -> None:
             },
         )
 
-    async with AsyncSessionLocal() as session:
-        query = await session.execute(select(Node).where(Node.label == label))
-        node = query.scalar_one_or_none()
+    query = await db_session.execute(_NODE_ID_BY_LABEL, {"label": label})
+    node_id = query.scalar_one_or_none()
 
-    assert node is None
+    assert node_id is None
 
 
 @pytest.mark.asyncio
-async def test_canvas_update_node_tool_updates_fields() -> None:
-    """Verify canvas.update_node updates stored fields."""
-    manager = get_tool_manager()
-    token = uuid.uuid4().hex
-
-    async with AsyncSessionLocal() as session:
-        canvas_repo = CanvasRepository(session)
-        node_repo = NodeRepository(session)
-        canvas = await canvas_repo.create_canvas(
-            DEFAULT_USER_ID, name=f"tool-update-{token}"
-        )
-        node = await node_repo.create_node(
-            canvas_id=canvas.id,
-            label=f"tool-update-{token}",
-            type=NodeType.TEXT,
-            position={"x": 1, "y": 2, "z": 3},
-            node_metadata={"status": "old"},
-        )
-
-    result = await manager.execute_tool(
-        "canvas.update_node",
-        {
-            "node_id": node.id,
-            "patch": {
-                "label": f"tool-update-label-{token}",
+@pytest.mark.parametrize(
+    ("patch", "expected_error", "expected_fields"),
+    [
+        (
+            {
+                "label": "tool-update-label",
                 "type": NodeType.DOCUMENT,
                 "position": {"x": 9},
                 "metadata": {"status": "new"},
             },
-        },
-    )
-
-    assert result.success
-    output = result.output
-    assert output["id"] == node.id
-    assert output["label"] == f"tool-update-label-{token}"
-    assert output["type"] == NodeType.DOCUMENT
-    assert output["position"] == {"x": 9, "y": 2, "z": 3}
-    assert output["metadata"] == {"status": "new"}
-
-    async with AsyncSessionLocal() as session:
-        updated_node = await NodeRepository(session).get_by_id(node.id)
-
-    assert updated_node is not None
-    assert updated_node.label == f"tool-update-label-{token}"
-    assert updated_node.type == NodeType.DOCUMENT
-    assert updated_node.get_position() == {"x": 9, "y": 2, "z": 3}
-    assert updated_node.get_metadata() == {"status": "new"}
-
-
-@pytest.mark.asyncio
-async def test_canvas_update_node_tool_accepts_content_alias() -> None:
-    """Verify canvas.update_node accepts content as label alias."""
+            None,
+            {
+                "label": "tool-update-label",
+                "type": NodeType.DOCUMENT,
+                "position": {"x": 9, "y": 2, "z": 3},
+                "metadata": {"status": "new"},
+            },
+        ),
+        (
+            {"content": "tool-content-updated"},
+            None,
+            {"label": "tool-content-updated"},
+        ),
+        (
+            {},
+            "No fields to update",
+            {
+                "label": "tool-update-seed",
+                "type": NodeType.TEXT,
+                "position": {"x": 1, "y": 2, "z": 3},
+                "metadata": {"status": "old"},
+            },
+        ),
+    ],
+    ids=["updates-fields", "content-alias", "rejects-empty-patch"],
+)
+async def test_canvas_update_node_tool_applies_patch(
+    db_session: AsyncSession,
+    module_canvas: Canvas,
+    patch: dict[str, Any],
+    expected_error: str | None,
+    expected_fields: dict[str, Any],
+) -> None:
+    """Verify canvas.update_node applies patches and rejects empty ones."""
     manager = get_tool_manager()
-    token = uuid.uuid4().hex
-
-    async with AsyncSessionLocal() as session:
-        canvas_repo = CanvasRepository(session)
-        node_repo = NodeRepository(session)
-        canvas = await canvas_repo.create_canvas(
-            DEFAULT_USER_ID, name=f"tool-update-content-{token}"
-        )
-        node = await node_repo.create_node(
-            canvas_id=canvas.id,
-            label=f"tool-content-{token}",
-            type=NodeType.TEXT,
-            position={"x": 0, "y": 0, "z": 0},
-        )
-
-    result = await manager.execute_tool(
-        "canvas.update_node",
-        {
-            "node_id": node.id,
-            "patch": {"content": f"tool-content-updated-{token}"},
-        },
+    node = await NodeRepository(db_session).create_node(
+        canvas_id=module_canvas.id,
+        label="tool-update-seed",
+        type=NodeType.TEXT,
+        position={"x": 1, "y": 2, "z": 3},
+        node_metadata={"status": "old"},
     )
 
-    assert result.success
-
-    async with AsyncSessionLocal() as session:
-        updated_node = await NodeRepository(session).get_by_id(node.id)
-
-    assert updated_node is not None
-    assert updated_node.label == f"tool-content-updated-{token}"
-
-
-@pytest.mark.asyncio
-async def test_canvas_update_node_tool_rejects_empty_patch() -> None:
-    """Verify canvas.update_node fails on empty patches."""
-    manager = get_tool_manager()
-    token = uuid.uuid4().hex
-
-    async with AsyncSessionLocal() as session:
-        canvas_repo = CanvasRepository(session)
-        node_repo = NodeRepository(session)
-        canvas = await canvas_repo.create_canvas(
-            DEFAULT_USER_ID, name=f"tool-update-empty-{token}"
-        )
-        node = await node_repo.create_node(
-            canvas_id=canvas.id,
-            label=f"tool-update-empty-{token}",
-            type=NodeType.TEXT,
-            position={"x": 0, "y": 0, "z": 0},
-        )
-
     result = await manager.execute_tool(
         "canvas.update_node",
-        {
-            "node_id": node.id,
-            "patch": {},
-        },
+        {"node_id": node.id, "patch": patch},
     )
 
-    assert not result.success
-    assert "No fields to update" in (result.error or "")
+    if expected_error is None:
+        assert result.success
+        assert result.output["id"] == node.id
+        for field, value in expected_fields.items():
+            assert result.output[field] == value
+    else:
+        assert not result.success
+        assert expected_error in (result.error or "")
+
+    await db_session.refresh(node)
+    stored = {
+        "label": node.label,
+        "type": node.type,
+        "position": node.get_position(),
+        "metadata": node.get_metadata(),
+    }
+    for field, value in expected_fields.items():
+        assert stored[field] == value
 
 
 @pytest.mark.asyncio
-async def test_canvas_update_node_tool_rejects_missing_node() -> None:
+async def test_canvas_update_node_tool_rejects_missing_node(db_session: AsyncSession) -> None:
     """Verify canvas.update_node fails on missing nodes."""
     manager = get_tool_manager()
 
@@ -204,29 +239,26 @@ async def test_canvas_update_node_tool_rejects_missing_node() -> None:
 
 
 @pytest.mark.asyncio
-async def test_canvas_link_nodes_tool_creates_edge() -> None:
+async def test_canvas_link_nodes_tool_creates_edge(
+    db_session: AsyncSession, module_canvas: Canvas
+) -> None:
     """Verify canvas.link_nodes persists an edge and returns its ID."""
     manager = get_tool_manager()
-    token = uuid.uuid4().hex
-
-    async with AsyncSessionLocal() as session:
-        canvas_repo = CanvasRepository(session)
-        node_repo = NodeRepository(session)
-        canvas = await canvas_repo.create_canvas(
-            DEFAULT_USER_ID, name=f"tool-edge-{token}"
-        )
-        source_node = await node_repo.create_node(
-            canvas_id=canvas.id,
-            label=f"tool-edge-source-{token}",
-            type=NodeType.TEXT,
-            position={"x": 0, "y": 0, "z": 0},
-        )
-        target_node = await node_repo.create_node(
-            canvas_id=canvas.id,
-            label=f"tool-edge-target-{token}",
-            type=NodeType.TEXT,
-            position={"x": 10, "y": 0, "z": 0},
-        )
+    token = _unique_token()
+
+    node_repo = NodeRepository(db_session)
+    source_node = await node_repo.create_node(
+        canvas_id=module_canvas.id,
+        label=f"tool-edge-source-{token}",
+        type=NodeType.TEXT,
+        position={"x": 0, "y": 0, "z": 0},
+    )
+    target_node = await node_repo.create_node(
+        canvas_id=module_canvas.id,
+        label=f"tool-edge-target-{token}",
+        type=NodeType.TEXT,
+        position={"x": 10, "y": 0, "z": 0},
+    )
 
     result = await manager.execute_tool(
         "canvas.link_nodes",
@@ -241,49 +273,39 @@ async def test_canvas_link_nodes_tool_creates_edge() -> None:
     assert result.success
     edge_id = result.output["id"]
 
-    async with AsyncSessionLocal() as session:
-        edge_repo = EdgeRepository(session)
-        edge = await edge_repo.get_by_id(edge_id)
-        assert edge is not None
-        assert edge.canvas_id == canvas.id
-        assert edge.from_node_id == source_node.id
-        assert edge.to_node_id == target_node.id
-        assert edge.relation_type == RelationType.REFERENCES
-
-        source_edges = await edge_repo.get_by_node(
-            source_node.id, as_source=True, as_target=True
-        )
-        target_edges = await edge_repo.get_by_node(
-            target_node.id, as_source=True, as_target=True
-        )
-        assert edge_id in {edge.id for edge in source_edges}
-        assert edge_id in {edge.id for edge in target_edges}
+    edge_repo = EdgeRepository(db_session)
+    edge = await edge_repo.get_by_id(edge_id)
+    assert edge is not None
+    assert edge.canvas_id == module_canvas.id
+    assert edge.from_node_id == source_node.id
+    assert edge.to_node_id == target_node.id
+    assert edge.relation_type == RelationType.REFERENCES
+
+    touching = await edge_repo.get_by_nodes([source_node.id, target_node.id])
+    assert edge_id in {edge.id for edge in touching}
 
 
 @pytest.mark.asyncio
-async def test_canvas_link_nodes_tool_rejects_invalid_relation_type() -> None:
+async def test_canvas_link_nodes_tool_rejects_invalid_relation_type(
+    db_session: AsyncSession, module_canvas: Canvas
+) -> None:
     """Verify invalid relation types are rejected before execution."""
     manager = get_tool_manager()
-    token = uuid.uuid4().hex
-
-    async with AsyncSessionLocal() as session:
-        canvas_repo = CanvasRepository(session)
-        node_repo = NodeRepository(session)
-        canvas = await canvas_repo.create_canvas(
-            DEFAULT_USER_ID, name=f"tool-edge-invalid-{token}"
-        )
-        source_node = await node_repo.create_node(
-            canvas_id=canvas.id,
-            label=f"tool-edge-source-{token}",
-            type=NodeType.TEXT,
-            position={"x": 0, "y": 0, "z": 0},
-        )
-        target_node = await node_repo.create_node(
-            canvas_id=canvas.id,
-            label=f"tool-edge-target-{token}",
-            type=NodeType.TEXT,
-            position={"x": 10, "y": 0, "z": 0},
-        )
+    token = _unique_token()
+
+    node_repo = NodeRepository(db_session)
+    source_node = await node_repo.create_node(
+        canvas_id=module_canvas.id,
+        label=f"tool-edge-source-{token}",
+        type=NodeType.TEXT,
+        position={"x": 0, "y": 0, "z": 0},
+    )
+    target_node = await node_repo.create_node(
+        canvas_id=module_canvas.id,
+        label=f"tool-edge-target-{token}",
+        type=NodeType.TEXT,
+        position={"x": 10, "y": 0, "z": 0},
+    )
 
     with pytest.raises(ToolValidationError):
         await manager.execute_tool(
@@ -297,23 +319,20 @@ async def test_canvas_link_nodes_tool_rejects_invalid_relation_type() -> None:
 
 
 @pytest.mark.asyncio
-async def test_canvas_link_nodes_tool_rejects_invalid_node() -> None:
+async def test_canvas_link_nodes_tool_rejects_invalid_node(
+    db_session: AsyncSession, module_canvas: Canvas
+) -> None:
     """Verify invalid node IDs fail without creating edges."""
     manager = get_tool_manager()
-    token = uuid.uuid4().hex
-
-    async with AsyncSessionLocal() as session:
-        canvas_repo = CanvasRepository(session)
-        node_repo = NodeRepository(session)
-        canvas = await canvas_repo.create_canvas(
-            DEFAULT_USER_ID, name=f"tool-edge-missing-{token}"
-        )
-        source_node = await node_repo.create_node(
-            canvas_id=canvas.id,
-            label=f"tool-edge-source-{token}",
-            type=NodeType.TEXT,
-            position={"x": 0, "y": 0, "z": 0},
-        )
+    token = _unique_token()
+
+    node_repo = NodeRepository(db_session)
+    source_node = await node_repo.create_node(
+        canvas_id=module_canvas.id,
+        label=f"tool-edge-source-{token}",
+        type=NodeType.TEXT,
+        position={"x": 0, "y": 0, "z": 0},
+    )
 
     result = await manager.execute_tool(
         "canvas.link_nodes",
@@ -326,11 +345,9 @@ async def test_canvas_link_nodes_tool_rejects_invalid_node() -> None:
 
     assert not result.success
 
-    async with AsyncSessionLocal() as session:
-        edge_repo = EdgeRepository(session)
-        edges = await edge_repo.get_by_node(
-            source_node.id, as_source=True, as_target=True
-        )
+    edges = await EdgeRepository(db_session).get_by_node(
+        source_node.id, as_source=True, as_target=True
+    )
 
     assert edges == []
 
@@ -339,9 +356,11 @@ async def test_canvas_link_nodes_tool_rejects_invalid_node() -> None:
 async def test_workspace_search_scopes() -> None:
     """Verify workspace.search filters results by scope."""
     manager = get_tool_manager()
-    token = uuid.uuid4().hex
+    token = _unique_token()
     query = f"search-{token}"
 
+    # Seeded through pooled sessions rather than db_session: the searches below
+    # run concurrently and cannot share a single savepoint-scoped connection.
     async with AsyncSessionLocal() as session:
         canvas_repo = CanvasRepository(session)
         node_repo = NodeRepository(session)
@@ -373,48 +392,51 @@ async def test_workspace_search_scopes() -> None:
             position={"x": 2, "y": 2, "z": 0},
         )
 
-    selection_result = await manager.execute_tool(
-        "workspace.search",
-        {
-            "query": query,
-            "scope": "selection",
-            "selection_ids": [node_one.id],
-        },
+    selection_result, canvas_result, all_result, empty_result = await asyncio.gather(
+        manager.execute_tool(
+            "workspace.search",
+            {
+                "query": query,
+                "scope": "selection",
+                "selection_ids": [node_one.id],
+            },
+        ),
+        manager.execute_tool(
+            "workspace.search",
+            {
+                "query": query,
+                "scope": "canvas",
+                "canvas_id": canvas_two.id,
+            },
+        ),
+        manager.execute_tool(
+            "workspace.search",
+            {
+                "query": query,
+                "scope": "all",
+            },
+        ),
+        manager.execute_tool(
+            "workspace.search",
+            {
+                "query": f"missing-{token}",
+                "scope": "all",
+            },
+        ),
     )
+
     assert selection_result.success
     assert [item["id"] for item in selection_result.output] == [node_one.id]
 
-    canvas_result = await manager.execute_tool(
-        "workspace.search",
-        {
-            "query": query,
-            "scope": "canvas",
-            "canvas_id": canvas_two.id,
-        },
-    )
     assert canvas_result.success
     canvas_ids = {item["id"] for item in canvas_result.output}
     assert canvas_ids == {node_two.id}
 
-    all_result = await manager.execute_tool(
-        "workspace.search",
-        {
-            "query": query,
-            "scope": "all",
-        },
-    )
     assert all_result.success
     all_ids = {item["id"] for item in all_result.output}
     assert node_one.id in all_ids
     assert node_two.id in all_ids
 
-    empty_result = await manager.execute_tool(
-        "workspace.search",
-        {
-            "query": f"missing-{token}",
-            "scope": "all",
-        },
-    )
     assert empty_result.success
     assert empty_result.output == []
 
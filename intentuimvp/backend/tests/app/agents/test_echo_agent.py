@@ -4,189 +4,172 @@ from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from pydantic import ValidationError
 
+from app.agents.base import BaseAgent
 from app.agents.echo_agent import EchoAgent, EchoResponse
 from app.gateway.client import GatewayClient, GatewayClientError
 
 
+def _echo_response(text: str, timestamp: str = "2024-01-01T00:00:00") -> dict:
+    """Build a Gateway response whose content echoes ``text``."""
+    content = f'{{"original": "{text}", "echo": "{text}", "timestamp": "{timestamp}"}}'
+    return {"choices": [{"message": {"content": content}}]}
+
+
+class _Spy:
+    """Record calls to an async ``generate`` stand-in before delegating."""
+
+    __slots__ = ("calls", "fn")
+
+    def __init__(self, fn) -> None:
+        self.fn = fn
+        self.calls: list[tuple[tuple, dict]] = []
+
+    async def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        return await self.fn(*args, **kwargs)
+
+
+# Canonical Gateway responses, built once at import and shared by tests.
+_HELLO_RESPONSE = _echo_response("hello")
+_EMPTY_RESPONSE = _echo_response("")
+_NUMERIC_RESPONSE = _echo_response("42")
+_HI_RESPONSE = _echo_response("hi")
+_SPEC_RESPONSE = _echo_response("spec")
+
+# Validation is covered by TestEchoResponse; the serialization test only needs
+# an already-built instance and its expected dump.
+_ECHO_TIMESTAMP = datetime(2024, 1, 1, 12, 0, 0)
+_ECHO_RESPONSE = EchoResponse.model_construct(
+    original="hello", echo="hello", timestamp=_ECHO_TIMESTAMP
+)
+_SERIALIZED_ECHO_RESPONSE = _ECHO_RESPONSE.model_dump()
+_EXPECTED_ECHO_DUMP = {"original": "hello", "echo": "hello", "timestamp": _ECHO_TIMESTAMP}
+
+
 class TestEchoAgent:
     """Tests for EchoAgent."""
 
     @pytest.mark.asyncio
-    async def test_run_success_with_gateway(self):
+    async def test_run_success_with_gateway(self, mock_gateway, echo_agent, async_return):
         """Test successful echo via Gateway."""
-        mock_gateway = MagicMock(spec=GatewayClient)
-        mock_gateway.generate = AsyncMock(
-            return_value={
-                "choices": [
-                    {
-                        "message": {
-                            "content": '{"original": "hello", "echo": "hello", "timestamp": "2024-01-01T00:00:00"}'
-                        }
-                    }
-                ]
-            }
-        )
+        mock_gateway.generate = async_return(_HELLO_RESPONSE)
 
-        agent = EchoAgent(gateway=mock_gateway)
-        result = await agent.run({"prompt": "hello"})
+        result = await echo_agent.run({"prompt": "hello"})
 
         assert result["original"] == "hello"
         assert result["echo"] == "hello"
         assert result["timestamp"] == "2024-01-01T00:00:00"
 
     @pytest.mark.asyncio
-    async def test_run_gateway_failure_fallback(self):
-        """Test that Gateway failure triggers fallback response."""
-        mock_gateway = MagicMock(spec=GatewayClient)
-        mock_gateway.generate = AsyncMock(side_effect=GatewayClientError("Gateway failed"))
-
-        agent = EchoAgent(gateway=mock_gateway)
-        result = await agent.run({"prompt": "test input"})
+    @pytest.mark.parametrize(
+        "gateway_result",
+        [
+            pytest.param(GatewayClientError("Gateway failed"), id="gateway-error"),
+            pytest.param({"invalid": "format"}, id="invalid-response-format"),
+            pytest.param(
+                {"choices": [{"message": {"content": "not json"}}]}, id="invalid-json"
+            ),
+            pytest.param(
+                {"choices": [{"message": {"content": '{"wrong": "fields"}'}}]},
+                id="validation-error",
+            ),
+        ],
+    )
+    async def test_run_gateway_problem_falls_back(
+        self,
+        mock_gateway,
+        gateway_result,
+        echo_agent,
+        async_return,
+        async_raise,
+    ):
+        """Test that Gateway errors and unusable responses trigger the fallback."""
+        if isinstance(gateway_result, Exception):
+            mock_gateway.generate = async_raise(gateway_result)
+        else:
+            mock_gateway.generate = async_return(gateway_result)
+
+        result = await echo_agent.run({"prompt": "test input"})
 
         # Fallback should return original input with [fallback] prefix
         assert result["original"] == "test input"
         assert result["echo"] == "[fallback] test input"
-        assert "timestamp" in result
         # Verify timestamp is valid ISO format
         datetime.fromisoformat(result["timestamp"])
 
     @pytest.mark.asyncio
-    async def test_run_with_empty_prompt(self):
+    async def test_run_with_empty_prompt(self, mock_gateway, echo_agent, async_return):
         """Test agent handles empty prompt gracefully."""
-        mock_gateway = MagicMock(spec=GatewayClient)
-        mock_gateway.generate = AsyncMock(
-            return_value={
-                "choices": [
-                    {
-                        "message": {
-                            "content": '{"original": "", "echo": "", "timestamp": "2024-01-01T00:00:00"}'
-                        }
-                    }
-                ]
-            }
-        )
+        mock_gateway.generate = async_return(_EMPTY_RESPONSE)
 
-        agent = EchoAgent(gateway=mock_gateway)
-        result = await agent.run({"prompt": ""})
+        result = await echo_agent.run({"prompt": ""})
 
         assert result["original"] == ""
         assert result["echo"] == ""
 
     @pytest.mark.asyncio
-    async def test_run_with_non_string_prompt_converts_to_string(self):
+    async def test_run_with_non_string_prompt_converts_to_string(
+        self,
+        mock_gateway,
+        echo_agent,
+        async_return,
+    ):
         """Test agent converts non-string prompts to strings."""
-        mock_gateway = MagicMock(spec=GatewayClient)
-        mock_gateway.generate = AsyncMock(
-            return_value={
-                "choices": [
-                    {
-                        "message": {
-                            "content": '{"original": "42", "echo": "42", "timestamp": "2024-01-01T00:00:00"}'
-                        }
-                    }
-                ]
-            }
-        )
+        mock_gateway.generate = async_return(_NUMERIC_RESPONSE)
 
-        agent = EchoAgent(gateway=mock_gateway)
-        result = await agent.run({"prompt": 42})
+        result = await echo_agent.run({"prompt": 42})
 
         assert result["original"] == "42"
         assert result["echo"] == "42"
 
     @pytest.mark.asyncio
-    async def test_run_with_missing_prompt_uses_empty_string(self):
+    async def test_run_with_missing_prompt_uses_empty_string(
+        self,
+        mock_gateway,
+        echo_agent,
+        async_return,
+    ):
         """Test agent handles missing prompt key gracefully."""
-        mock_gateway = MagicMock(spec=GatewayClient)
-        mock_gateway.generate = AsyncMock(
-            return_value={
-                "choices": [
-                    {
-                        "message": {
-                            "content": '{"original": "", "echo": "", "timestamp": "2024-01-01T00:00:00"}'
-                        }
-                    }
-                ]
-            }
-        )
+        mock_gateway.generate = async_return(_EMPTY_RESPONSE)
 
-        agent = EchoAgent(gateway=mock_gateway)
-        result = await agent.run({})
+        result = await echo_agent.run({})
 
         assert result["original"] == ""
         assert result["echo"] == ""
 
     @pytest.mark.asyncio
-    async def test_run_gateway_invalid_response_format_fallback(self):
-        """Test that invalid Gateway response format triggers fallback."""
-        mock_gateway = MagicMock(spec=GatewayClient)
-        mock_gateway.generate = AsyncMock(return_value={"invalid": "format"})
-
-        agent = EchoAgent(gateway=mock_gateway)
-        result = await agent.run({"prompt": "test"})
-
-        assert result["original"] == "test"
-        assert result["echo"] == "[fallback] test"
-        assert "timestamp" in result
-
-    @pytest.mark.asyncio
-    async def test_run_gateway_invalid_json_fallback(self):
-        """Test that invalid JSON in Gateway response triggers fallback."""
-        mock_gateway = MagicMock(spec=GatewayClient)
-        mock_gateway.generate = AsyncMock(
-            return_value={"choices": [{"message": {"content": "not json"}}]}
-        )
-
-        agent = EchoAgent(gateway=mock_gateway)
-        result = await agent.run({"prompt": "test"})
-
-        assert result["original"] == "test"
-        assert result["echo"] == "[fallback] test"
-
-    @pytest.mark.asyncio
-    async def test_run_gateway_validation_error_fallback(self):
-        """Test that Pydantic validation error triggers fallback."""
-        mock_gateway = MagicMock(spec=GatewayClient)
-        mock_gateway.generate = AsyncMock(
-            return_value={"choices": [{"message": {"content": '{"wrong": "fields"}'}}]}
-        )
-
-        agent = EchoAgent(gateway=mock_gateway)
-        result = await agent.run({"prompt": "test"})
-
-        assert result["original"] == "test"
-        assert result["echo"] == "[fallback] test"
-
-    @pytest.mark.asyncio
-    async def test_uses_generate_structured_method(self):
+    async def test_uses_generate_structured_method(self, mock_gateway, echo_agent, async_return):
         """Test that agent uses generate_structured for structured output."""
-        mock_gateway = MagicMock(spec=GatewayClient)
-        mock_gateway.generate = AsyncMock(
-            return_value={
-                "choices": [
-                    {
-                        "message": {
-                            "content": '{"original": "hi", "echo": "hi", "timestamp": "2024-01-01T00:00:00"}'
-                        }
-                    }
-                ]
-            }
-        )
+        spy = _Spy(async_return(_HI_RESPONSE))
+        mock_gateway.generate = spy
 
-        agent = EchoAgent(gateway=mock_gateway)
-        await agent.run({"prompt": "hi"})
+        await echo_agent.run({"prompt": "hi"})
 
         # Verify Gateway was called
-        mock_gateway.generate.assert_called_once()
-        call_args = mock_gateway.generate.call_args
-        messages = call_args.kwargs.get("messages") or call_args.args[0]
+        assert len(spy.calls) == 1
+        call_args, call_kwargs = spy.calls[0]
+        messages = call_kwargs.get("messages") or call_args[0]
 
         # Verify system prompt includes echo instructions
         system_msg = next(m for m in messages if m["role"] == "system")
         assert "echo agent" in system_msg["content"].lower()
         assert "json" in system_msg["content"].lower()
 
+    @pytest.mark.asyncio
+    async def test_gateway_mock_matches_client_contract(self):
+        """Test the agent only uses attributes that GatewayClient provides."""
+        spec_gateway = MagicMock(spec=GatewayClient)
+        spec_gateway.generate = AsyncMock(return_value=_SPEC_RESPONSE)
+
+        agent = EchoAgent(gateway=spec_gateway)
+        result = await agent.run({"prompt": "spec"})
+
+        assert result["echo"] == "spec"
+        call_kwargs = spec_gateway.generate.call_args.kwargs
+        assert set(call_kwargs) >= {"model", "messages"}
+
 
 class TestEchoResponse:
     """Tests for EchoResponse Pydantic model."""
@@ -203,15 +186,7 @@ class TestEchoResponse:
 
     def test_echo_response_serialization(self):
         """Test EchoResponse model serialization."""
-        response = EchoResponse(
-            original="hello", echo="hello", timestamp=datetime(2024, 1, 1, 12, 0, 0)
-        )
-
-        data = response.model_dump()
-
-        assert data["original"] == "hello"
-        assert data["echo"] == "hello"
-        assert data["timestamp"] == datetime(2024, 1, 1, 12, 0, 0)
+        assert _SERIALIZED_ECHO_RESPONSE == _EXPECTED_ECHO_DUMP
 
     def test_echo_response_from_dict(self):
         """Test creating EchoResponse from dict."""
@@ -228,8 +203,6 @@ class TestEchoResponse:
 
     def test_echo_response_missing_required_field_raises_error(self):
         """Test that missing required fields raise validation error."""
-        from pydantic import ValidationError
-
         with pytest.raises(ValidationError):
             EchoResponse.model_validate({"original": "test", "echo": "test"})
 
@@ -237,22 +210,11 @@ class TestEchoResponse:
 class TestGatewayOnlyEnforcement:
     """Tests to verify EchoAgent follows Gateway-only pattern."""
 
-    def test_no_direct_provider_imports_in_echo_agent(self):
+    def test_no_direct_provider_imports_in_echo_agent(self, lowered_sources, forbidden_imports):
         """Verify EchoAgent does not import provider SDKs directly."""
-        import inspect
-
-        import app.agents.echo_agent as echo_module
-
-        source = inspect.getsource(echo_module)
-
         # Ensure no direct imports of OpenAI, Anthropic, etc.
-        assert "import openai" not in source.lower()
-        assert "import anthropic" not in source.lower()
-        assert "from openai" not in source.lower()
-        assert "from anthropic" not in source.lower()
+        assert not forbidden_imports.search(lowered_sources["echo"])
 
     def test_echo_agent_extends_base_agent(self):
         """Verify EchoAgent extends BaseAgent."""
-        from app.agents.base import BaseAgent
-
         assert issubclass(EchoAgent, BaseAgent)
@@ -1,41 +1,56 @@
 """Tests for IntentDeciphererAgent."""
 
-import json
-from unittest.mock import AsyncMock, MagicMock
+import re
+from unittest.mock import AsyncMock
 
 import pytest
+from pydantic_core import to_json
 
 from app.agents.base import BaseAgent
 from app.agents.intent_decipherer import IntentDeciphererAgent
 from app.context.models import AssumptionCategory
-from app.gateway.client import GatewayClient, GatewayClientError
+from app.gateway.client import GatewayClientError
 
 
 def build_gateway_response(payload: dict) -> dict:
     """Build a Gateway response payload for structured output."""
-    return {"choices": [{"message": {"content": json.dumps(payload)}}]}
+    return {"choices": [{"message": {"content": to_json(payload).decode()}}]}
+
+
+# Canonical Gateway responses, serialized once at import and shared by tests.
+_RESEARCH_RESPONSE = build_gateway_response(
+    {
+        "primary_intent": {
+            "name": "research",
+            "confidence": 0.92,
+            "description": "Find sources and summarize",
+        },
+        "should_auto_execute": True,
+        "reasoning": "High confidence and no risky assumptions.",
+    }
+)
+_CREATE_RESPONSE = build_gateway_response(
+    {
+        "primary_intent": {
+            "name": "create",
+            "confidence": 0.88,
+            "description": "Build a new dashboard",
+        },
+        "should_auto_execute": True,
+        "reasoning": "Clear intent with sufficient parameters.",
+    }
+)
+
+_TEXT_FIELD_RE = re.compile("text")
 
 
 class TestIntentDeciphererAgent:
     """Tests for IntentDeciphererAgent behavior."""
 
     @pytest.mark.asyncio
-    async def test_decipher_success_uses_gateway(self):
+    async def test_decipher_success_uses_gateway(self, mock_gateway):
         """Test deciphering success via Gateway."""
-        mock_gateway = MagicMock(spec=GatewayClient)
-        mock_gateway.generate = AsyncMock(
-            return_value=build_gateway_response(
-                {
-                    "primary_intent": {
-                        "name": "research",
-                        "confidence": 0.92,
-                        "description": "Find sources and summarize",
-                    },
-                    "should_auto_execute": True,
-                    "reasoning": "High confidence and no risky assumptions.",
-                }
-            )
-        )
+        mock_gateway.generate = AsyncMock(return_value=_RESEARCH_RESPONSE)
 
         agent = IntentDeciphererAgent(
             gateway=mock_gateway,
@@ -57,13 +72,16 @@ class TestIntentDeciphererAgent:
         assert any(m["role"] == "user" for m in messages)
 
     @pytest.mark.asyncio
-    async def test_decipher_gateway_failure_returns_fallback(self):
+    async def test_decipher_gateway_failure_returns_fallback(
+        self,
+        mock_gateway,
+        decipherer_agent,
+        async_raise,
+    ):
         """Test Gateway failure yields fallback result."""
-        mock_gateway = MagicMock(spec=GatewayClient)
-        mock_gateway.generate = AsyncMock(side_effect=GatewayClientError("Gateway failed"))
+        mock_gateway.generate = async_raise(GatewayClientError("Gateway failed"))
 
-        agent = IntentDeciphererAgent(gateway=mock_gateway)
-        result = await agent.decipher("Analyze quarterly revenue.")
+        result = await decipherer_agent.decipher("Analyze quarterly revenue.")
 
         assert result.primary_intent.name == "chat"
         assert result.primary_intent.confidence == 0.5
@@ -71,54 +89,40 @@ class TestIntentDeciphererAgent:
         assert "Gateway failed" in result.reasoning
 
     @pytest.mark.asyncio
-    async def test_decipher_invalid_gateway_format_returns_fallback(self):
+    async def test_decipher_invalid_gateway_format_returns_fallback(
+        self,
+        mock_gateway,
+        decipherer_agent,
+        async_return,
+    ):
         """Test invalid Gateway response format triggers fallback."""
-        mock_gateway = MagicMock(spec=GatewayClient)
-        mock_gateway.generate = AsyncMock(return_value={"invalid": "format"})
+        mock_gateway.generate = async_return({"invalid": "format"})
 
-        agent = IntentDeciphererAgent(gateway=mock_gateway)
-        result = await agent.decipher("Summarize the meeting notes.")
+        result = await decipherer_agent.decipher("Summarize the meeting notes.")
 
         assert result.primary_intent.name == "chat"
         assert result.should_auto_execute is False
 
     @pytest.mark.asyncio
-    async def test_run_requires_text(self):
+    async def test_run_requires_text(self, decipherer_agent):
         """Test run validates required text input."""
-        agent = IntentDeciphererAgent(gateway=MagicMock(spec=GatewayClient))
-
-        with pytest.raises(ValueError, match="text"):
-            await agent.run({})
+        with pytest.raises(ValueError, match=_TEXT_FIELD_RE):
+            await decipherer_agent.run({})
 
     @pytest.mark.asyncio
-    async def test_run_returns_dict(self):
+    async def test_run_returns_dict(self, mock_gateway, decipherer_agent, async_return):
         """Test run returns serialized result dict."""
-        mock_gateway = MagicMock(spec=GatewayClient)
-        mock_gateway.generate = AsyncMock(
-            return_value=build_gateway_response(
-                {
-                    "primary_intent": {
-                        "name": "create",
-                        "confidence": 0.88,
-                        "description": "Build a new dashboard",
-                    },
-                    "should_auto_execute": True,
-                    "reasoning": "Clear intent with sufficient parameters.",
-                }
-            )
-        )
+        mock_gateway.generate = async_return(_CREATE_RESPONSE)
 
-        agent = IntentDeciphererAgent(gateway=mock_gateway)
-        result = await agent.run({"text": "Create a dashboard for sales KPIs."})
+        result = await decipherer_agent.run({"text": "Create a dashboard for sales KPIs."})
 
         assert isinstance(result, dict)
         assert result["primary_intent"]["name"] == "create"
         assert result["should_auto_execute"] is True
 
-    def test_create_assumption_from_string_category(self):
+    def test_create_assumption_from_string_category(self, decipherer_agent):
         """Test creating assumptions from string categories."""
-        agent = IntentDeciphererAgent(gateway=MagicMock(spec=GatewayClient))
-        assumption = agent.create_assumption(
+        assumption = decipherer_agent.create_assumption(
             text="User wants the latest dataset.",
             confidence=0.72,
             category="context",
@@ -136,15 +140,8 @@ class TestGatewayOnlyEnforcement:
         """Verify IntentDeciphererAgent extends BaseAgent."""
         assert issubclass(IntentDeciphererAgent, BaseAgent)
 
-    def test_no_direct_provider_imports_in_intent_decipherer(self):
+    def test_no_direct_provider_imports_in_intent_decipherer(
+        self, lowered_sources, forbidden_imports
+    ):
         """Verify IntentDeciphererAgent does not import provider SDKs directly."""
-        import inspect
-
-        import app.agents.intent_decipherer as decipher_module
-
-        source = inspect.getsource(decipher_module)
-
-        assert "import openai" not in source.lower()
-        assert "import anthropic" not in source.lower()
-        assert "from openai" not in source.lower()
-        assert "from anthropic" not in source.lower()
+        assert not forbidden_imports.search(lowered_sources["decipher"])
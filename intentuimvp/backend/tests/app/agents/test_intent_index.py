@@ -9,6 +9,9 @@ import pytest
 from app.agents.intent_index import IntentIndexLookup
 from app.models.intent import UserIntent
 
+# All lookups in this module share one event loop.
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
 
 class DummySession:
     """Minimal async context manager for lookup tests."""
@@ -20,90 +23,101 @@ class DummySession:
         return None
 
 
-class StubIntentIndex(IntentIndexLookup):
-    """Intent index lookup with stubbed candidates."""
+_DUMMY_SESSION = DummySession()
 
-    def __init__(self, candidates: list[UserIntent], **kwargs) -> None:
-        super().__init__(session_factory=lambda: DummySession(), **kwargs)
-        self._candidates = candidates
+# Fixed reference time for candidate timestamps and the lookup clock.
+_NOW = datetime(2024, 1, 1, tzinfo=UTC)
 
-    async def _fetch_candidates(self, session, user_id: str) -> list[UserIntent]:
-        return list(self._candidates)
 
+class _FrozenDatetime(datetime):
+    """``datetime`` whose ``now`` always returns ``_NOW``."""
 
-@pytest.mark.asyncio
-async def test_intent_index_lookup_uses_embeddings_when_available() -> None:
-    """Matches should use embedding similarity when provided."""
-    now = datetime.now(UTC)
-    candidate = UserIntent(
-        user_id="user",
-        intent_text="completely different text",
-        intent_type="research",
-        created_at=now,
-        embedding="[1, 0]",
-    )
-    lookup = StubIntentIndex(
-        [candidate],
-        similarity_threshold=0.8,
-        embedding_provider=lambda text: [1.0, 0.0],
-    )
+    @classmethod
+    def now(cls, tz=None) -> datetime:
+        return _NOW
 
-    matches = await lookup.lookup("user", "alpha")
 
-    assert len(matches) == 1
-    assert matches[0].resolution == "research"
-    assert matches[0].similarity == pytest.approx(1.0)
+@pytest.fixture(autouse=True)
+def _frozen_clock(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Pin the lookup's clock so recency weights do not drift with the date."""
+    monkeypatch.setattr("app.agents.intent_index.datetime", _FrozenDatetime)
 
 
-@pytest.mark.asyncio
-async def test_intent_index_lookup_falls_back_to_text_similarity() -> None:
-    """Text similarity should be used if embeddings are unavailable."""
-    now = datetime.now(UTC)
-    candidate = UserIntent(
-        user_id="user",
-        intent_text="alpha beta",
-        intent_type="research",
-        created_at=now,
-        embedding="not-a-vector",
-    )
-    lookup = StubIntentIndex(
-        [candidate],
-        similarity_threshold=0.8,
-        embedding_provider=lambda text: None,
-    )
+class StubIntentIndex(IntentIndexLookup):
+    """Intent index lookup with stubbed candidates."""
 
-    matches = await lookup.lookup("user", "alpha beta")
+    def __init__(self, candidates: list[UserIntent], **kwargs) -> None:
+        super().__init__(session_factory=lambda: _DUMMY_SESSION, **kwargs)
+        self._candidates = candidates
 
-    assert len(matches) == 1
-    assert matches[0].similarity == pytest.approx(1.0)
+    async def _fetch_candidates(self, session, user_id: str) -> list[UserIntent]:
+        return list(self._candidates)
 
 
-@pytest.mark.asyncio
-async def test_intent_index_lookup_ranks_by_recency() -> None:
-    """Recent matches should outrank older ones with equal similarity."""
-    now = datetime.now(UTC)
-    recent = UserIntent(
-        user_id="user",
-        intent_text="alpha",
-        intent_type="research",
-        created_at=now - timedelta(days=1),
-        embedding="[1, 0]",
-    )
-    older = UserIntent(
+def _candidate(
+    intent_text: str, intent_type: str, embedding: str, *, days_old: int = 0
+) -> UserIntent:
+    """Build an indexed intent created ``days_old`` days before ``_NOW``."""
+    return UserIntent(
         user_id="user",
-        intent_text="alpha",
-        intent_type="create",
-        created_at=now - timedelta(days=10),
-        embedding="[1, 0]",
+        intent_text=intent_text,
+        intent_type=intent_type,
+        created_at=_NOW - timedelta(days=days_old),
+        embedding=embedding,
     )
+
+
+@pytest.mark.parametrize(
+    ("candidates", "threshold", "input_embedding", "query", "expected_resolutions"),
+    [
+        pytest.param(
+            [_candidate("completely different text", "research", "[1, 0]")],
+            0.8,
+            [1.0, 0.0],
+            "alpha",
+            ["research"],
+            id="uses-embeddings-when-available",
+        ),
+        pytest.param(
+            [_candidate("alpha beta", "research", "not-a-vector")],
+            0.8,
+            None,
+            "alpha beta",
+            ["research"],
+            id="falls-back-to-text-similarity",
+        ),
+        pytest.param(
+            [
+                _candidate("alpha", "create", "[1, 0]", days_old=10),
+                _candidate("alpha", "research", "[1, 0]", days_old=1),
+            ],
+            0.5,
+            [1.0, 0.0],
+            "alpha",
+            ["research", "create"],
+            id="ranks-by-recency",
+        ),
+    ],
+)
+async def test_intent_index_lookup(
+    candidates: list[UserIntent],
+    threshold: float,
+    input_embedding: list[float] | None,
+    query: str,
+    expected_resolutions: list[str],
+) -> None:
+    """Lookups score by embeddings or text and rank equal matches by recency."""
     lookup = StubIntentIndex(
-        [older, recent],
-        similarity_threshold=0.5,
-        embedding_provider=lambda text: [1.0, 0.0],
+        candidates,
+        similarity_threshold=threshold,
+        embedding_provider=lambda text: input_embedding,
     )
 
-    matches = await lookup.lookup("user", "alpha")
+    matches = await lookup.lookup("user", query)
 
-    assert len(matches) == 2
-    assert matches[0].recency_weight > matches[1].recency_weight
-    assert matches[0].score > matches[1].score
+    assert [match.resolution for match in matches] == expected_resolutions
+    for match in matches:
+        assert match.similarity == pytest.approx(1.0)
+    for newer, older in zip(matches, matches[1:]):
+        assert newer.recency_weight > older.recency_weight
+        assert newer.score > older.score
@@ -1,5 +1,8 @@
 """Tests for Agent Orchestrator and Registry."""
 
+import asyncio
+from collections.abc import Iterator
+from dataclasses import replace
 
 import pytest
 
@@ -28,12 +31,62 @@ class FailingAgent(BaseAgent):
         raise ValueError("Intentional failure")
 
 
+class SlowAgent(BaseAgent):
+    """Test agent that blocks until cancelled."""
+
+    async def run(self, input_data: dict):
+        await asyncio.Event().wait()
+        return {"done": True}
+
+
+class BarrierAgent(BaseAgent):
+    """Test agent that returns once every run has reached ``barrier``."""
+
+    async def run(self, input_data: dict):
+        await input_data["barrier"].wait()
+        return {"released": True}
+
+
+# Metadata shared by tests that only register these agents unchanged.
+_TEST_AGENT_META = AgentMetadata(
+    name="test_agent",
+    agent_class=DummyAgent2,
+    description="Test",
+    singleton=True,
+)
+_FAILING_META = AgentMetadata(
+    name="failing_agent",
+    agent_class=FailingAgent,
+    description="Failing",
+    singleton=True,
+)
+
+
+@pytest.fixture
+def registry() -> AgentRegistry:
+    """Return an empty AgentRegistry for the test."""
+    return AgentRegistry()
+
+
+@pytest.fixture(scope="module")
+def orchestrator() -> Iterator[AgentOrchestrator]:
+    """Preload the global orchestrator with ``test_agent`` and ``failing_agent``.
+
+    Tests using this fixture must not register further agents or hooks, since
+    the global orchestrator outlives the module.
+    """
+    orchestrator = get_orchestrator()
+    orchestrator.registry.register_many([_TEST_AGENT_META, _FAILING_META])
+    yield orchestrator
+    for metadata in (_TEST_AGENT_META, _FAILING_META):
+        orchestrator.registry.unregister(metadata.name)
+
+
 class TestAgentRegistry:
     """Tests for AgentRegistry."""
 
-    def test_register_agent(self):
+    def test_register_agent(self, registry):
         """Test registering an agent."""
-        registry = AgentRegistry()
         metadata = AgentMetadata(
             name="test_agent",
             agent_class=DummyAgent2,
@@ -46,59 +99,41 @@ class TestAgentRegistry:
         assert registry.get("test_agent") is metadata
         assert len(registry.list_agents()) == 1
 
-    def test_register_duplicate_overwrites(self):
+    def test_register_duplicate_overwrites(self, registry):
         """Test that registering duplicate overwrites."""
-        registry = AgentRegistry()
-        metadata1 = AgentMetadata(
-            name="test_agent",
-            agent_class=DummyAgent2,
-            description="First",
-        )
-        metadata2 = AgentMetadata(
-            name="test_agent",
-            agent_class=DummyAgent2,
-            description="Second",
-        )
+        metadata1 = replace(_TEST_AGENT_META, description="First")
+        metadata2 = replace(_TEST_AGENT_META, description="Second")
 
         registry.register(metadata1)
         registry.register(metadata2)
 
         assert registry.get("test_agent").description == "Second"
 
-    def test_unregister_agent(self):
+    def test_unregister_agent(self, registry):
         """Test unregistering an agent."""
-        registry = AgentRegistry()
-        metadata = AgentMetadata(
-            name="test_agent",
-            agent_class=DummyAgent2,
-            description="Test",
-        )
-
-        registry.register(metadata)
+        registry.register(_TEST_AGENT_META)
         assert registry.get("test_agent") is not None
 
         registry.unregister("test_agent")
         assert registry.get("test_agent") is None
 
-    def test_list_agents_filter_by_capability(self):
+    def test_list_agents_filter_by_capability(self, registry):
         """Test listing agents with capability filter."""
-        registry = AgentRegistry()
-
-        registry.register(
-            AgentMetadata(
-                name="agent1",
-                agent_class=DummyAgent2,
-                description="Agent 1",
-                capabilities=["read", "write"],
-            )
-        )
-        registry.register(
-            AgentMetadata(
-                name="agent2",
-                agent_class=DummyAgent2,
-                description="Agent 2",
-                capabilities=["read"],
-            )
+        registry.register_many(
+            [
+                AgentMetadata(
+                    name="agent1",
+                    agent_class=DummyAgent2,
+                    description="Agent 1",
+                    capabilities=["read", "write"],
+                ),
+                AgentMetadata(
+                    name="agent2",
+                    agent_class=DummyAgent2,
+                    description="Agent 2",
+                    capabilities=["read"],
+                ),
+            ]
         )
 
         read_agents = registry.list_agents(capability="read")
@@ -107,36 +142,20 @@ class TestAgentRegistry:
         write_agents = registry.list_agents(capability="write")
         assert len(write_agents) == 1
 
-    @pytest.mark.asyncio
-    async def test_get_singleton_instance(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_get_singleton_instance(self, registry):
         """Test getting singleton agent instance."""
-        registry = AgentRegistry()
-        metadata = AgentMetadata(
-            name="test_agent",
-            agent_class=DummyAgent2,
-            description="Test",
-            singleton=True,
-        )
-
-        registry.register(metadata)
+        registry.register(_TEST_AGENT_META)
 
         instance1 = await registry.get_instance("test_agent")
         instance2 = await registry.get_instance("test_agent")
 
         assert instance1 is instance2
 
-    @pytest.mark.asyncio
-    async def test_get_non_singleton_instance(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_get_non_singleton_instance(self, registry):
         """Test getting non-singleton agent instance."""
-        registry = AgentRegistry()
-        metadata = AgentMetadata(
-            name="test_agent",
-            agent_class=DummyAgent2,
-            description="Test",
-            singleton=False,
-        )
-
-        registry.register(metadata)
+        registry.register(replace(_TEST_AGENT_META, singleton=False))
 
         instance1 = await registry.get_instance("test_agent")
         instance2 = await registry.get_instance("test_agent")
@@ -157,15 +176,10 @@ class TestAgentOrchestrator:
     def test_register_agent(self):
         """Test registering agent through orchestrator."""
         orchestrator = AgentOrchestrator()
-        metadata = AgentMetadata(
-            name="test_agent",
-            agent_class=DummyAgent2,
-            description="Test",
-        )
 
-        orchestrator.register_agent(metadata)
+        orchestrator.register_agent(_TEST_AGENT_META)
 
-        assert orchestrator.registry.get("test_agent") is metadata
+        assert orchestrator.registry.get("test_agent") is _TEST_AGENT_META
 
     def test_add_hooks(self):
         """Test adding pre and post hooks."""
@@ -183,19 +197,9 @@ class TestAgentOrchestrator:
         assert len(orchestrator._pre_hooks) == 1
         assert len(orchestrator._post_hooks) == 1
 
-    @pytest.mark.asyncio
-    async def test_execute_agent_success(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_execute_agent_success(self, orchestrator):
         """Test successful agent execution."""
-        orchestrator = AgentOrchestrator()
-        metadata = AgentMetadata(
-            name="test_agent",
-            agent_class=DummyAgent2,
-            description="Test",
-            singleton=True,
-        )
-
-        orchestrator.register_agent(metadata)
-
         result = await orchestrator.execute_agent(
             "test_agent", {"value": "hello"}
         )
@@ -205,7 +209,7 @@ class TestAgentOrchestrator:
         assert result.agent_name == "test_agent"
         assert result.duration_ms > 0
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_execute_agent_not_registered(self):
         """Test executing non-existent agent."""
         orchestrator = AgentOrchestrator()
@@ -215,37 +219,18 @@ class TestAgentOrchestrator:
         assert not result.success
         assert "not registered" in result.error
 
-    @pytest.mark.asyncio
-    async def test_execute_agent_failure(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_execute_agent_failure(self, orchestrator):
         """Test agent execution with failure."""
-        orchestrator = AgentOrchestrator()
-        metadata = AgentMetadata(
-            name="failing_agent",
-            agent_class=FailingAgent,
-            description="Failing",
-            singleton=True,
-        )
-
-        orchestrator.register_agent(metadata)
-
         result = await orchestrator.execute_agent("failing_agent", {})
 
         assert not result.success
         assert "Intentional failure" in result.error
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_execute_agent_with_timeout(self):
         """Test agent execution with timeout."""
         orchestrator = AgentOrchestrator()
-
-        # Create a slow agent
-        class SlowAgent(BaseAgent):
-            async def run(self, input_data: dict):
-                import asyncio
-
-                await asyncio.sleep(2)
-                return {"done": True}
-
         metadata = AgentMetadata(
             name="slow_agent",
             agent_class=SlowAgent,
@@ -260,19 +245,9 @@ class TestAgentOrchestrator:
         assert not result.success
         assert "timed out" in result.error
 
-    @pytest.mark.asyncio
-    async def test_execute_parallel(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_execute_parallel(self, orchestrator):
         """Test parallel execution of multiple agents."""
-        orchestrator = AgentOrchestrator()
-        metadata = AgentMetadata(
-            name="test_agent",
-            agent_class=DummyAgent2,
-            description="Test",
-            singleton=True,
-        )
-
-        orchestrator.register_agent(metadata)
-
         results = await orchestrator.execute_parallel(
             [
                 ("test_agent", {"value": "a"}),
@@ -287,19 +262,33 @@ class TestAgentOrchestrator:
         assert results[1].output == {"result": "processed: b"}
         assert results[2].output == {"result": "processed: c"}
 
-    @pytest.mark.asyncio
-    async def test_execute_workflow_sequential(self):
-        """Test sequential workflow execution."""
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_execute_parallel_runs_concurrently(self):
+        """Test parallel execution overlaps agent runs instead of serializing them."""
         orchestrator = AgentOrchestrator()
-        metadata = AgentMetadata(
-            name="test_agent",
-            agent_class=DummyAgent2,
-            description="Test",
-            singleton=True,
+        orchestrator.register_agent(
+            AgentMetadata(
+                name="barrier_agent",
+                agent_class=BarrierAgent,
+                description="Barrier",
+                singleton=True,
+            )
         )
+        barrier = asyncio.Barrier(5)
 
-        orchestrator.register_agent(metadata)
+        # The barrier only opens once all five runs are in flight, so a
+        # serialized executor would time out on the first run.
+        results = await orchestrator.execute_parallel(
+            [("barrier_agent", {"barrier": barrier}) for _ in range(5)],
+            timeout=1.0,
+        )
 
+        assert all(r.success for r in results)
+        assert all(r.output == {"released": True} for r in results)
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_execute_workflow_sequential(self, orchestrator):
+        """Test sequential workflow execution."""
         steps = [
             WorkflowStep(agent_name="test_agent", step_id="step1", input_data={"value": "a"}),
             WorkflowStep(agent_name="test_agent", step_id="step2", input_data={"value": "b"}),
@@ -312,19 +301,9 @@ class TestAgentOrchestrator:
         assert len(result.steps) == 3
         assert all(s.success for s in result.steps)
 
-    @pytest.mark.asyncio
-    async def test_execute_workflow_with_dependencies(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_execute_workflow_with_dependencies(self, orchestrator):
         """Test workflow with step dependencies."""
-        orchestrator = AgentOrchestrator()
-        metadata = AgentMetadata(
-            name="test_agent",
-            agent_class=DummyAgent2,
-            description="Test",
-            singleton=True,
-        )
-
-        orchestrator.register_agent(metadata)
-
         steps = [
             WorkflowStep(agent_name="test_agent", step_id="step1", input_data={"value": "a"}),
             WorkflowStep(
@@ -346,26 +325,16 @@ class TestAgentOrchestrator:
         assert result.success
         assert len(result.steps) == 3
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_execute_workflow_continue_on_error(self):
         """Test workflow with continue_on_error flag."""
         orchestrator = AgentOrchestrator()
 
-        success_metadata = AgentMetadata(
-            name="success_agent",
-            agent_class=DummyAgent2,
-            description="Success",
-            singleton=True,
+        success_metadata = replace(
+            _TEST_AGENT_META, name="success_agent", description="Success"
         )
-        fail_metadata = AgentMetadata(
-            name="failing_agent",
-            agent_class=FailingAgent,
-            description="Failing",
-            singleton=True,
-        )
-
         orchestrator.register_agent(success_metadata)
-        orchestrator.register_agent(fail_metadata)
+        orchestrator.register_agent(_FAILING_META)
 
         steps = [
             WorkflowStep(agent_name="success_agent", step_id="step1", input_data={"value": "a"}),
@@ -1,11 +1,14 @@
 """Tests for Tool Manager and tool calling."""
 
 import asyncio
-import uuid
+import copy
+import itertools
+import secrets
 
 import pytest
 import pytest_asyncio
 from pydantic import BaseModel, Field
+from pydantic import ValidationError as PydanticValidationError
 
 from app.agents.tools import (
     ToolExecutionResult,
@@ -19,6 +22,11 @@ from app.agents.tools import (
 from app.api.assumption_store import get_assumption_store
 from app.database import async_engine
 
+# HITL sessions persist resolutions, so ids stay unique across runs sharing a
+# database; the counter keeps them unique within a run without more entropy.
+_RUN_PREFIX = secrets.token_hex(4)
+_session_counter = itertools.count()
+
 
 class SearchParams(BaseModel):
     """Test parameters model."""
@@ -27,33 +35,122 @@ class SearchParams(BaseModel):
     num_results: int = Field(default=5, ge=1, le=20)
 
 
+@pytest.fixture(scope="module")
+def base_manager() -> ToolManager:
+    """Build one ToolManager with the built-in tools for read-only tests."""
+    return ToolManager()
+
+
+async def _search(query: str, num_results: int = 5) -> dict:
+    """Stand-in search tool; tests only exercise its argument validation."""
+    return {}
+
+
+async def _process(value: str) -> str:
+    return f"processed: {value}"
+
+
+def _sync_process(value: str) -> str:
+    return f"sync: {value}"
+
+
+def _no_schema() -> str:
+    return "ok"
+
+
+async def _failing() -> str:
+    raise ValueError("Tool failed")
+
+
+def _copy_manager(base: ToolManager) -> ToolManager:
+    """Copy ``base`` with its own tool registry."""
+    manager = copy.copy(base)
+    manager._tools = dict(base._tools)
+    return manager
+
+
+@pytest.fixture(scope="module")
+def registered_manager(base_manager: ToolManager) -> ToolManager:
+    """Copy ``base_manager`` and register the stand-in tools used by tests.
+
+    Tests only validate arguments against or execute these tools, so the
+    copy is shared by the module.
+    """
+    manager = _copy_manager(base_manager)
+    manager.register_function(
+        name="search",
+        description="Search",
+        func=_search,
+        parameters=SearchParams,
+        is_async=True,
+    )
+    manager.register_function(
+        name="test_tool", description="Test", func=_process, is_async=True
+    )
+    manager.register_function(
+        name="sync_tool", description="Sync", func=_sync_process, is_async=False
+    )
+    manager.register_function(name="no_schema_tool", description="Test", func=_no_schema)
+    manager.register_function(
+        name="failing_tool", description="Failing", func=_failing, is_async=True
+    )
+    return manager
+
+
+@pytest.fixture
+def manager(base_manager: ToolManager) -> ToolManager:
+    """Return a copy of ``base_manager`` with its own tool registry."""
+    return _copy_manager(base_manager)
+
+
 class TestToolManager:
     """Tests for ToolManager."""
 
-    def test_init(self):
+    def test_init(self, base_manager):
         """Test initialization registers built-in tools."""
-        manager = ToolManager()
-
         # Should have built-in tools
-        assert manager.get_tool("web_search") is not None
-        assert manager.get_tool("read_file") is not None
-        assert manager.get_tool("write_file") is not None
-        assert manager.get_tool("get_current_time") is not None
-        assert manager.get_tool("calculate") is not None
-        assert manager.get_tool("hitl.request_approval") is not None
-
-    def test_register_function(self):
-        """Test registering a function as a tool."""
+        assert base_manager.get_tool("web_search") is not None
+        assert base_manager.get_tool("read_file") is not None
+        assert base_manager.get_tool("write_file") is not None
+        assert base_manager.get_tool("get_current_time") is not None
+        assert base_manager.get_tool("calculate") is not None
+        assert base_manager.get_tool("hitl.request_approval") is not None
+
+    def test_new_manager_reuses_builtin_tools(self, base_manager):
+        """Test later managers copy the built-in tools into their own registry."""
         manager = ToolManager()
 
-        def test_func(arg1: str) -> str:
-            return arg1
+        assert manager.get_tool("web_search") is base_manager.get_tool("web_search")
+        assert manager._tools is not base_manager._tools
+
+    def test_subclass_keeps_its_own_builtin_tools(self, base_manager):
+        """Test a subclass overriding built-in registration gets its own cache."""
+
+        class MinimalToolManager(ToolManager):
+            def _register_builtin_tools(self) -> None:
+                self.register_function(name="ping", description="Ping", func=_no_schema)
+
+        manager = MinimalToolManager()
 
+        assert manager.get_tool("ping") is not None
+        assert manager.get_tool("web_search") is None
+        assert ToolManager().get_tool("ping") is None
+
+    @pytest.mark.parametrize(
+        ("func", "parameters", "is_async"),
+        [
+            pytest.param(_sync_process, None, False, id="sync-no-schema"),
+            pytest.param(_search, SearchParams, True, id="async-with-schema"),
+        ],
+    )
+    def test_register_function(self, manager, func, parameters, is_async):
+        """Test registering a function as a tool."""
         manager.register_function(
             name="test_tool",
             description="Test tool",
-            func=test_func,
-            is_async=False,
+            func=func,
+            parameters=parameters,
+            is_async=is_async,
         )
 
         tool = manager.get_tool("test_tool")
@@ -61,31 +158,11 @@ class TestToolManager:
         assert tool is not None
         assert tool.name == "test_tool"
         assert tool.description == "Test tool"
-        assert not tool.is_async
-
-    def test_register_function_with_parameters(self):
-        """Test registering function with parameter validation."""
-        manager = ToolManager()
-
-        async def test_func(query: str, num_results: int = 5) -> dict:
-            return {"results": []}
+        assert tool.is_async is is_async
+        assert tool.parameters is parameters
 
-        manager.register_function(
-            name="search_tool",
-            description="Search tool",
-            func=test_func,
-            parameters=SearchParams,
-            is_async=True,
-        )
-
-        tool = manager.get_tool("search_tool")
-
-        assert tool.parameters == SearchParams
-
-    def test_register_mcp_tool(self):
+    def test_register_mcp_tool(self, manager):
         """Test registering an MCP tool."""
-        manager = ToolManager()
-
         manager.register_mcp_tool(
             name="mcp_calendar",
             server_name="calendar_server",
@@ -100,26 +177,20 @@ class TestToolManager:
         assert tool.mcp_tool_name == "list_events"
         assert tool.requires_confirmation
 
-    def test_get_tool_not_found(self):
+    def test_get_tool_not_found(self, base_manager):
         """Test getting non-existent tool."""
-        manager = ToolManager()
-
-        tool = manager.get_tool("nonexistent_tool")
+        tool = base_manager.get_tool("nonexistent_tool")
 
         assert tool is None
 
-    def test_list_tools_all(self):
+    def test_list_tools_all(self, base_manager):
         """Test listing all tools."""
-        manager = ToolManager()
-
-        tools = manager.list_tools()
+        tools = base_manager.list_tools()
 
         assert len(tools) >= 5  # At least built-in tools
 
-    def test_list_tools_exclude_mcp(self):
+    def test_list_tools_exclude_mcp(self, manager):
         """Test listing tools excluding MCP."""
-        manager = ToolManager()
-
         # Register an MCP tool
         manager.register_mcp_tool(
             name="mcp_test",
@@ -133,206 +204,94 @@ class TestToolManager:
 
         assert len(all_tools) > len(non_mcp_tools)
 
-    def test_list_tools_exclude_dangerous(self):
+    def test_list_tools_exclude_dangerous(self, base_manager):
         """Test listing tools excluding dangerous."""
-        manager = ToolManager()
-
-        all_tools = manager.list_tools(include_dangerous=True)
-        safe_tools = manager.list_tools(include_dangerous=False)
+        all_tools = base_manager.list_tools(include_dangerous=True)
+        safe_tools = base_manager.list_tools(include_dangerous=False)
 
         # read_file and write_file are marked dangerous
         assert len(all_tools) >= len(safe_tools)
 
-    def test_validate_arguments_no_schema(self):
-        """Test validation when no schema exists."""
-        manager = ToolManager()
-
-        def test_func() -> str:
-            return "ok"
-
-        manager.register_function(
-            name="test_tool",
-            description="Test",
-            func=test_func,
-        )
-
-        is_valid, errors = manager.validate_arguments("test_tool", {"any": "args"})
-
-        assert is_valid
-        assert len(errors) == 0
-
-    def test_validate_arguments_with_schema_valid(self):
-        """Test validation with valid arguments."""
-        manager = ToolManager()
-
-        async def search_func(query: str, num_results: int = 5) -> dict:
-            return {}
-
-        manager.register_function(
-            name="search",
-            description="Search",
-            func=search_func,
-            parameters=SearchParams,
-            is_async=True,
-        )
-
-        is_valid, errors = manager.validate_arguments(
-            "search", {"query": "test", "num_results": 10}
-        )
-
-        assert is_valid
-        assert len(errors) == 0
-
-    def test_validate_arguments_with_schema_invalid(self):
-        """Test validation with invalid arguments."""
-        manager = ToolManager()
-
-        async def search_func(query: str, num_results: int = 5) -> dict:
-            return {}
-
-        manager.register_function(
-            name="search",
-            description="Search",
-            func=search_func,
-            parameters=SearchParams,
-            is_async=True,
-        )
-
-        # Missing required field
-        is_valid, errors = manager.validate_arguments("search", {"num_results": 10})
-
-        assert not is_valid
-        assert len(errors) > 0
-
-    def test_validate_arguments_tool_not_found(self):
+    @pytest.mark.parametrize(
+        ("tool_name", "arguments", "expected_valid"),
+        [
+            pytest.param("no_schema_tool", {"any": "args"}, True, id="no-schema"),
+            pytest.param(
+                "search", {"query": "test", "num_results": 10}, True, id="schema-valid"
+            ),
+            # Missing required field
+            pytest.param("search", {"num_results": 10}, False, id="schema-invalid"),
+        ],
+    )
+    def test_validate_arguments(self, registered_manager, tool_name, arguments, expected_valid):
+        """Test validation with and without a parameter schema."""
+        is_valid, errors = registered_manager.validate_arguments(tool_name, arguments)
+
+        assert is_valid is expected_valid
+        assert bool(errors) is not expected_valid
+
+    def test_validate_arguments_tool_not_found(self, base_manager):
         """Test validation for non-existent tool."""
-        manager = ToolManager()
-
-        is_valid, errors = manager.validate_arguments("nonexistent", {})
+        is_valid, errors = base_manager.validate_arguments("nonexistent", {})
 
         assert not is_valid
         assert "not found" in errors[0]
 
-    @pytest.mark.asyncio
-    async def test_execute_tool_success(self):
-        """Test successful tool execution."""
-        manager = ToolManager()
-
-        async def test_func(value: str) -> str:
-            return f"processed: {value}"
-
-        manager.register_function(
-            name="test_tool",
-            description="Test",
-            func=test_func,
-            is_async=True,
-        )
-
-        result = await manager.execute_tool("test_tool", {"value": "hello"})
-
-        assert result.success
-        assert result.output == "processed: hello"
-        assert result.execution_time_ms >= 0
-
-    @pytest.mark.asyncio
-    async def test_execute_tool_not_found(self):
-        """Test executing non-existent tool."""
-        manager = ToolManager()
-
-        result = await manager.execute_tool("nonexistent", {})
-
-        assert not result.success
-        assert "not found" in result.error
-
-    @pytest.mark.asyncio
-    async def test_execute_tool_validation_error(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    @pytest.mark.parametrize(
+        ("tool_name", "arguments", "expected_output", "expected_error"),
+        [
+            pytest.param(
+                "test_tool", {"value": "hello"}, "processed: hello", None, id="async"
+            ),
+            pytest.param("sync_tool", {"value": "test"}, "sync: test", None, id="sync"),
+            pytest.param("failing_tool", {}, None, "Tool failed", id="function-error"),
+            pytest.param("nonexistent", {}, None, "not found", id="not-found"),
+        ],
+    )
+    async def test_execute_tool(
+        self, registered_manager, tool_name, arguments, expected_output, expected_error
+    ):
+        """Test tool execution results for success, failure and unknown tools."""
+        result = await registered_manager.execute_tool(tool_name, arguments)
+
+        assert result.success is (expected_error is None)
+        if expected_error is None:
+            assert result.output == expected_output
+            assert result.execution_time_ms >= 0
+        else:
+            assert expected_error in result.error
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_execute_tool_validation_error(self, registered_manager):
         """Test tool execution with validation error."""
-        manager = ToolManager()
-
-        async def search_func(query: str, num_results: int = 5) -> dict:
-            return {}
-
-        manager.register_function(
-            name="search",
-            description="Search",
-            func=search_func,
-            parameters=SearchParams,
-            is_async=True,
-        )
-
         with pytest.raises(ToolValidationError) as exc_info:
-            await manager.execute_tool("search", {"num_results": 10})
+            await registered_manager.execute_tool("search", {"num_results": 10})
 
         assert exc_info.value.tool_name == "search"
         assert len(exc_info.value.errors) > 0
 
-    @pytest.mark.asyncio
-    async def test_execute_tool_function_error(self):
-        """Test tool execution with function error."""
-        manager = ToolManager()
-
-        async def failing_func() -> str:
-            raise ValueError("Tool failed")
-
-        manager.register_function(
-            name="failing_tool",
-            description="Failing",
-            func=failing_func,
-            is_async=True,
-        )
-
-        result = await manager.execute_tool("failing_tool", {})
-
-        assert not result.success
-        assert "Tool failed" in result.error
-
-    @pytest.mark.asyncio
-    async def test_execute_sync_tool(self):
-        """Test executing synchronous tool."""
-        manager = ToolManager()
-
-        def sync_func(value: str) -> str:
-            return f"sync: {value}"
-
-        manager.register_function(
-            name="sync_tool",
-            description="Sync",
-            func=sync_func,
-            is_async=False,
-        )
-
-        result = await manager.execute_tool("sync_tool", {"value": "test"})
-
-        assert result.success
-        assert result.output == "sync: test"
-
-    @pytest.mark.asyncio
-    async def test_recommend_tools(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_recommend_tools(self, base_manager):
         """Test tool recommendation."""
-        manager = ToolManager()
-
-        recommendations = await manager.recommend_tools("Search for information about AI")
+        recommendations = await base_manager.recommend_tools("Search for information about AI")
 
         assert len(recommendations) > 0
         # Should recommend web_search
         assert any(r.tool_name == "web_search" for r in recommendations)
 
-    @pytest.mark.asyncio
-    async def test_recommend_tools_no_match(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_recommend_tools_no_match(self, base_manager):
         """Test tool recommendation with no matches."""
-        manager = ToolManager()
-
-        recommendations = await manager.recommend_tools("xyzabc")
+        recommendations = await base_manager.recommend_tools("xyzabc")
 
         # May return empty or low-confidence recommendations
         assert isinstance(recommendations, list)
 
-    @pytest.mark.asyncio
-    async def test_recommend_tools_sorted_by_confidence(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_recommend_tools_sorted_by_confidence(self, base_manager):
         """Test that recommendations are sorted by confidence."""
-        manager = ToolManager()
-
-        recommendations = await manager.recommend_tools(
+        recommendations = await base_manager.recommend_tools(
             "Search the web and read the file"
         )
 
@@ -340,12 +299,12 @@ class TestToolManager:
         confidences = [r.confidence for r in recommendations]
         assert confidences == sorted(confidences, reverse=True)
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_hitl_request_approval_waits_for_resolution(self):
         """HITL tool should wait for approvals and return resolutions."""
         manager = get_tool_manager()
         store = get_assumption_store()
-        session_id = f"hitl-session-{uuid.uuid4().hex}"
+        session_id = f"hitl-session-{_RUN_PREFIX}-{next(_session_counter)}"
         assumptions = [
             {
                 "id": "assumption-a",
@@ -385,7 +344,7 @@ class TestToolManager:
             edited_text="Deliver a detailed report.",
         )
 
-        result = await asyncio.wait_for(task, timeout=2)
+        result = await asyncio.wait_for(task, timeout=0.5)
 
         assert result.success
         assert result.output["session_id"] == session_id
@@ -405,7 +364,7 @@ class TestGlobalToolManager:
 
         assert tm1 is tm2
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_call_tool_convenience(self):
         """Test the call_tool convenience function."""
         # Note: This uses the real tool manager, so we test with a built-in tool
@@ -414,11 +373,9 @@ class TestGlobalToolManager:
         assert result is not None
         assert "timezone" in result
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_call_tool_with_validation_error(self):
         """Test call_tool raises on validation error."""
-        from pydantic import BaseModel
-
         manager = get_tool_manager()
 
         # Create a proper parameter model
@@ -497,13 +454,12 @@ class TestToolValidationError:
 
         assert error.tool_name == "test_tool"
         assert error.errors == ["Field 'query' is required"]
-        assert "test_tool" in str(error)
-        assert "Field 'query' is required" in str(error)
+        message = str(error)
+        assert "test_tool" in message
+        assert "Field 'query' is required" in message
 
     def test_initialization_with_validation_error(self):
         """Test ToolValidationError with Pydantic ValidationError."""
-        from pydantic import ValidationError as PydanticValidationError
-
         try:
             SearchParams()  # Missing required field
             assert False, "Should have raised ValidationError"
@@ -517,8 +473,12 @@ class TestToolValidationError:
             assert tool_error.validation_errors is not None
 
 
-@pytest_asyncio.fixture(autouse=True)
+@pytest_asyncio.fixture(scope="module", loop_scope="module", autouse=True)
 async def _dispose_async_engine():
-    """Dispose the async engine to avoid lingering background threads."""
+    """Dispose the async engine once the module's tests have finished.
+
+    Only the HITL test touches the database, and it runs on the same module
+    event loop, so one dispose releases its pooled connection.
+    """
     yield
     await async_engine.dispose()
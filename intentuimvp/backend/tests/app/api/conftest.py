@@ -0,0 +1,184 @@
+"""Shared fixtures for API tests."""
+
+import uuid
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import AbstractContextManager, ExitStack, contextmanager
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, testclient
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, get_async_db, get_db
+
+
+@contextmanager
+def _rollback_sessionmaker(engine: Engine) -> Iterator[sessionmaker]:
+    """Yield a session factory whose writes roll back on exit.
+
+    Sessions join an outer transaction with ``create_savepoint``, so endpoint
+    commits only release SAVEPOINTs and nothing outlives the block.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    # pysqlite defers BEGIN until the first DML statement; start the
+    # transaction explicitly so SAVEPOINT/RELEASE nest inside it.
+    connection.exec_driver_sql("BEGIN")
+    try:
+        yield sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            bind=connection,
+            join_transaction_mode="create_savepoint",
+        )
+    finally:
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(scope="session")
+def rollback_sessionmaker() -> Callable[[Engine], AbstractContextManager[sessionmaker]]:
+    """Return the context manager that binds a rolled-back session factory."""
+    return _rollback_sessionmaker
+
+
+@pytest.fixture(scope="session")
+def sync_rollback_engine() -> Iterator[Engine]:
+    """Create the in-memory test database and schema once per session.
+
+    Tests reach it through ``testing_session_local``, so nothing they write
+    survives the test.
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def testing_session_local(
+    sync_rollback_engine: Engine,
+    rollback_sessionmaker: Callable[[Engine], AbstractContextManager[sessionmaker]],
+) -> Iterator[sessionmaker]:
+    """Provide a session factory whose writes roll back after the test."""
+    with rollback_sessionmaker(sync_rollback_engine) as session_factory:
+        yield session_factory
+
+
+@pytest.fixture(scope="session")
+def _entered_test_clients() -> Iterator[Callable[[FastAPI], testclient.TestClient]]:
+    """Enter one TestClient per app and keep it open for the session."""
+    clients: dict[FastAPI, testclient.TestClient] = {}
+    with ExitStack() as stack:
+
+        def enter(app: FastAPI) -> testclient.TestClient:
+            if app not in clients:
+                clients[app] = stack.enter_context(testclient.TestClient(app))
+            return clients[app]
+
+        yield enter
+
+
+@pytest.fixture
+def db_client(
+    _entered_test_clients: Callable[[FastAPI], testclient.TestClient],
+    monkeypatch: pytest.MonkeyPatch,
+) -> Callable[[FastAPI, sessionmaker], testclient.TestClient]:
+    """Return a factory for the app's session client bound to a session factory.
+
+    ``get_db`` is overridden for the current test only; ``monkeypatch``
+    removes the override afterwards.
+    """
+
+    def bind(app: FastAPI, session_factory: sessionmaker) -> testclient.TestClient:
+        def override_get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+        return _entered_test_clients(app)
+
+    return bind
+
+
+@pytest.fixture(scope="module")
+def test_db_uri() -> str:
+    """Name a shared-cache in-memory SQLite database for the module.
+
+    The sync setup engine and the async endpoint engine open the same URI, so
+    both see one database without touching disk.
+    """
+    return f"file:test_{uuid.uuid4().hex}?mode=memory&cache=shared&uri=true"
+
+
+@pytest.fixture(scope="module")
+def sync_engine(test_db_uri: str) -> Iterator[Engine]:
+    """Create sync engine for test database setup."""
+    engine = create_engine(
+        f"sqlite:///{test_db_uri}",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def async_engine(test_db_uri: str, sync_engine: Engine):
+    """Create async engine for the module's endpoints.
+
+    Depends on ``sync_engine`` so its connection keeps the in-memory database
+    alive for as long as this engine is in use.
+    """
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{test_db_uri}",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def async_session_maker(async_engine) -> async_sessionmaker[AsyncSession]:
+    """Create async session factory for the module's endpoints."""
+    return async_sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def async_client(
+    async_app: FastAPI,
+    async_session_maker: async_sessionmaker[AsyncSession],
+) -> AsyncIterator[httpx.AsyncClient]:
+    """Create an ASGI client for the module's ``async_app``.
+
+    ``get_async_db`` is routed to the module database. Requests dispatch
+    straight into the app on the test's event loop, with no TestClient
+    portal thread in between.
+    """
+
+    async def override_get_async_db():
+        async with async_session_maker() as session:
+            yield session
+
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+    transport = httpx.ASGITransport(app=async_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    async_app.dependency_overrides.pop(get_async_db, None)
@@ -1,7 +1,10 @@
 """Tests for context API endpoint."""
 
+from collections.abc import Callable, Iterator
+
 import pytest
 from fastapi import FastAPI, testclient
+from pydantic_core import to_json
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -10,10 +13,23 @@ from app.agents.intent_decipherer import IntentClassification, IntentDeciphering
 from app.api.context import get_decipherer
 from app.api.context import router as context_router
 from app.context.router import ContextRouter
-from app.database import get_db
 from app.models.intent import AssumptionResolutionDB
 from app.models.intent import Base as IntentBase
 
+_JSON_HEADERS = {"content-type": "application/json"}
+
+# Request bodies serialized once at import and posted as raw content.
+_EMPTY_TEXT_BODY = to_json({"text": "", "attachments": []})
+_WHITESPACE_BODY = to_json({"text": "   ", "attachments": []})
+_MISSING_TEXT_BODY = to_json({"attachments": []})
+_TOO_LONG_BODY = to_json({"text": "a" * 10001, "attachments": []})
+_NO_ATTACHMENTS_BODY = to_json({"text": "test"})
+
+
+def _post_context(client: testclient.TestClient, body: bytes):
+    """POST a pre-serialized JSON body to the context endpoint."""
+    return client.post("/api/context", content=body, headers=_JSON_HEADERS)
+
 
 class FakeIntentDecipherer:
     """Stub intent decipherer for API tests."""
@@ -83,178 +99,182 @@ def build_assumption_result() -> IntentDecipheringResult:
     )
 
 
-@pytest.fixture
-def app(monkeypatch) -> FastAPI:
+# Stateless fakes built once at import and shared by every app fixture.
+_CHAT_DECIPHERER = FakeIntentDecipherer(result=build_result("chat", 0.5))
+_ASSUMPTION_DECIPHERER = FakeIntentDecipherer(result=build_assumption_result())
+_NEAR_THRESHOLD_DECIPHERER = FakeIntentDecipherer(
+    result=IntentDecipheringResult(
+        primary_intent=IntentClassification(
+            name="research",
+            confidence=0.94,
+            description="Research a topic based on the request",
+        ),
+        should_auto_execute=True,
+        reasoning="High confidence, but below auto-execute threshold.",
+    )
+)
+
+
+@pytest.fixture(scope="module")
+def app() -> Iterator[FastAPI]:
     """Create a test FastAPI app with the context router."""
-    fake = FakeIntentDecipherer(result=build_result("chat", 0.5))
-    router = ContextRouter(intent_decipherer=fake)
-    monkeypatch.setattr("app.api.context.get_context_router", lambda: router)
+    router = ContextRouter(intent_decipherer=_CHAT_DECIPHERER)
 
     app = FastAPI()
     app.include_router(context_router)
-    return app
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr("app.api.context.get_context_router", lambda: router)
+        yield app
 
 
-@pytest.fixture
-def client(app: FastAPI) -> testclient.TestClient:
-    """Create a test client for the context endpoint."""
-    return testclient.TestClient(app)
+@pytest.fixture(scope="module")
+def client(app: FastAPI) -> Iterator[testclient.TestClient]:
+    """Create a test client for the context endpoint.
 
+    One plain-text POST runs up front so first-call costs on the LLM routing
+    path are paid in fixture setup rather than by the first test.
+    """
+    with testclient.TestClient(app) as client:
+        client.post("/api/context", json={"text": "warmup", "attachments": []})
+        yield client
 
-@pytest.fixture
-def assumptions_db() -> sessionmaker:
-    """Provide a shared in-memory database for assumption tests."""
+
+@pytest.fixture(scope="session")
+def assumptions_engine():
+    """Create the in-memory assumption database once per session."""
     engine = create_engine(
         "sqlite://",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
     IntentBase.metadata.create_all(bind=engine)
-    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    yield engine
+    engine.dispose()
 
 
 @pytest.fixture
-def assumptions_app(assumptions_db: sessionmaker) -> FastAPI:
+def assumptions_db(assumptions_engine, rollback_sessionmaker) -> Iterator[sessionmaker]:
+    """Provide a session factory whose writes roll back after the test."""
+    with rollback_sessionmaker(assumptions_engine) as session_factory:
+        yield session_factory
+
+
+@pytest.fixture(scope="session")
+def assumptions_app() -> FastAPI:
     """Create a test app with overrides for assumption endpoints."""
     app = FastAPI()
     app.include_router(context_router)
 
-    decipherer = FakeIntentDecipherer(result=build_assumption_result())
-
     def override_get_decipherer() -> FakeIntentDecipherer:
-        return decipherer
-
-    def override_get_db():
-        db = assumptions_db()
-        try:
-            yield db
-        finally:
-            db.close()
+        return _ASSUMPTION_DECIPHERER
 
     app.dependency_overrides[get_decipherer] = override_get_decipherer
-    app.dependency_overrides[get_db] = override_get_db
     return app
 
 
 @pytest.fixture
-def assumptions_client(assumptions_app: FastAPI) -> testclient.TestClient:
-    """Create a test client for assumption endpoints."""
-    return testclient.TestClient(assumptions_app)
+def assumptions_client(
+    assumptions_app: FastAPI,
+    assumptions_db: sessionmaker,
+    db_client: Callable[[FastAPI, sessionmaker], testclient.TestClient],
+) -> testclient.TestClient:
+    """Return the assumption client with ``get_db`` bound to this test's database."""
+    return db_client(assumptions_app, assumptions_db)
 
 
 class TestContextEndpoint:
     """Test suite for POST /api/context endpoint."""
 
-    def test_submit_context_slash_command(self, client: testclient.TestClient) -> None:
-        """Test submitting context with slash command."""
-        response = client.post(
-            "/api/context",
-            json={"text": "/help", "attachments": []},
-        )
+    @pytest.mark.parametrize(
+        ("payload", "expected_handler", "expected_confidence", "expected_status"),
+        [
+            pytest.param(
+                to_json({"text": "/help", "attachments": []}),
+                "help_handler",
+                1.0,
+                "routed",
+                id="help",
+            ),
+            pytest.param(
+                to_json({"text": "/research AI trends", "attachments": []}),
+                "research_handler",
+                1.0,
+                "routed",
+                id="research",
+            ),
+            pytest.param(
+                to_json({"text": "/research", "attachments": ["file1.txt", "file2.pdf"]}),
+                "research_handler",
+                1.0,
+                "routed",
+                id="with-attachments",
+            ),
+            pytest.param(
+                to_json({"text": "/clear", "attachments": []}),
+                "clear_handler",
+                1.0,
+                "routed",
+                id="clear",
+            ),
+            pytest.param(
+                to_json({"text": "/unknown", "attachments": []}),
+                "help_handler",
+                0.5,
+                "routed",
+                id="unknown-to-help",
+            ),
+            pytest.param(
+                to_json({"text": "Hello, how are you?", "attachments": []}),
+                "clarification_handler",
+                0.5,
+                "clarification_required",
+                id="plain-text",
+            ),
+        ],
+    )
+    def test_submit_context_routing(
+        self,
+        client: testclient.TestClient,
+        payload: bytes,
+        expected_handler: str,
+        expected_confidence: float,
+        expected_status: str,
+    ) -> None:
+        """Test slash commands and plain text route to the expected handler."""
+        response = _post_context(client, payload)
         assert response.status_code == 200
         data = response.json()
-        assert data["handler"] == "help_handler"
-        assert data["confidence"] == 1.0
-        assert data["status"] == "routed"
+        assert data["handler"] == expected_handler
+        assert data["confidence"] == expected_confidence
+        assert data["status"] == expected_status
         assert "reason" in data
 
-    def test_submit_context_research_command(self, client: testclient.TestClient) -> None:
-        """Test submitting /research command."""
-        response = client.post(
-            "/api/context",
-            json={"text": "/research AI trends", "attachments": []},
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["handler"] == "research_handler"
-        assert data["confidence"] == 1.0
-
-    def test_submit_context_plain_text(self, client: testclient.TestClient) -> None:
-        """Test submitting plain text without slash command."""
-        response = client.post(
-            "/api/context",
-            json={"text": "Hello, how are you?", "attachments": []},
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["handler"] == "clarification_handler"
-        assert data["confidence"] == 0.5
-        assert data["status"] == "clarification_required"
-
-    def test_submit_context_with_attachments(self, client: testclient.TestClient) -> None:
-        """Test submitting context with attachments."""
-        response = client.post(
-            "/api/context",
-            json={"text": "/research", "attachments": ["file1.txt", "file2.pdf"]},
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["handler"] == "research_handler"
-
     def test_submit_context_empty_text(self, client: testclient.TestClient) -> None:
         """Test submitting context with empty text returns 400."""
-        response = client.post(
-            "/api/context",
-            json={"text": "", "attachments": []},
-        )
+        response = _post_context(client, _EMPTY_TEXT_BODY)
         assert response.status_code == 400
         assert "cannot be empty" in response.json()["detail"]
 
     def test_submit_context_whitespace_only(self, client: testclient.TestClient) -> None:
         """Test submitting context with only whitespace returns 400."""
-        response = client.post(
-            "/api/context",
-            json={"text": "   ", "attachments": []},
-        )
+        response = _post_context(client, _WHITESPACE_BODY)
         assert response.status_code == 400
 
     def test_submit_context_missing_text(self, client: testclient.TestClient) -> None:
         """Test submitting context without text field returns 422."""
-        response = client.post(
-            "/api/context",
-            json={"attachments": []},
-        )
+        response = _post_context(client, _MISSING_TEXT_BODY)
         assert response.status_code == 422
 
     def test_submit_context_exceeds_max_length(self, client: testclient.TestClient) -> None:
         """Test submitting context that exceeds max length returns 400."""
-        long_text = "a" * 10001
-        response = client.post(
-            "/api/context",
-            json={"text": long_text, "attachments": []},
-        )
+        response = _post_context(client, _TOO_LONG_BODY)
         assert response.status_code == 400
         assert "exceeds maximum length" in response.json()["detail"]
 
-    def test_submit_context_unknown_slash_command(self, client: testclient.TestClient) -> None:
-        """Test submitting unknown slash command routes to help."""
-        response = client.post(
-            "/api/context",
-            json={"text": "/unknown", "attachments": []},
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["handler"] == "help_handler"
-        assert data["confidence"] == 0.5
-
     def test_submit_context_no_attachments(self, client: testclient.TestClient) -> None:
         """Test submitting context without attachments field (defaults to empty list)."""
-        response = client.post(
-            "/api/context",
-            json={"text": "test"},
-        )
-        assert response.status_code == 200
-
-    def test_submit_context_clear_command(self, client: testclient.TestClient) -> None:
-        """Test submitting /clear command."""
-        response = client.post(
-            "/api/context",
-            json={"text": "/clear", "attachments": []},
-        )
+        response = _post_context(client, _NO_ATTACHMENTS_BODY)
         assert response.status_code == 200
-        data = response.json()
-        assert data["handler"] == "clear_handler"
-        assert data["confidence"] == 1.0
 
 
 class TestAssumptionEndpoints:
@@ -277,26 +297,19 @@ class TestAssumptionEndpoints:
         assert data["assumptions"][0]["id"] == "assumption-1"
         assert data["session_id"] is not None
 
-    def test_generate_assumptions_auto_execute_threshold(self) -> None:
+    def test_generate_assumptions_auto_execute_threshold(
+        self,
+        assumptions_app: FastAPI,
+        assumptions_client: testclient.TestClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
         """Test auto-execute requires meeting the configured confidence threshold."""
-        app = FastAPI()
-        app.include_router(context_router)
-
-        primary = IntentClassification(
-            name="research",
-            confidence=0.94,
-            description="Research a topic based on the request",
+        monkeypatch.setitem(
+            assumptions_app.dependency_overrides,
+            get_decipherer,
+            lambda: _NEAR_THRESHOLD_DECIPHERER,
         )
-        result = IntentDecipheringResult(
-            primary_intent=primary,
-            should_auto_execute=True,
-            reasoning="High confidence, but below auto-execute threshold.",
-        )
-        decipherer = FakeIntentDecipherer(result=result)
-        app.dependency_overrides[get_decipherer] = lambda: decipherer
-
-        client = testclient.TestClient(app)
-        response = client.post(
+        response = assumptions_client.post(
             "/api/context/assumptions",
             json={"text": "Research quarterly performance"},
         )
@@ -1,148 +1,138 @@
 """Integration tests for edge API endpoints."""
 
-import asyncio
-import tempfile
-from pathlib import Path
+from collections.abc import Iterator
 
+import httpx
 import pytest
-from fastapi import FastAPI, testclient
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from fastapi import FastAPI
+from sqlalchemy import delete, func, insert, select
 
 # Import models to register them with Base
 import app.models.canvas  # noqa: F401 - Side-effect import to register models
 import app.models.edge  # noqa: F401 - Side-effect import to register models
 import app.models.node  # noqa: F401 - Side-effect import to register models
 from app.api.edges import router as edges_router
-from app.database import Base, get_async_db
 from app.models.canvas import Canvas
+from app.models.edge import Edge
 from app.models.node import Node, NodeType
 
 
-@pytest.fixture
-def test_db_file():
-    """Create temporary file for test database."""
-    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
-        db_path = f.name
-    yield db_path
-    Path(db_path).unlink(missing_ok=True)
-
-
-@pytest.fixture
-def sync_engine(test_db_file: str):
-    """Create sync engine for test database setup."""
-    engine = create_engine(
-        f"sqlite:///{test_db_file}",
-        connect_args={"check_same_thread": False},
-    )
-    Base.metadata.create_all(bind=engine)
-    yield engine
-    engine.dispose()
-
-
-@pytest.fixture
-def async_engine(test_db_file: str):
-    """Create async engine for edge API tests."""
-    engine = create_async_engine(f"sqlite+aiosqlite:///{test_db_file}")
-    yield engine
-    asyncio.run(engine.dispose())
-
-
-@pytest.fixture
-def sync_session_local(sync_engine):
-    """Create sync session factory for test setup."""
-    return sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
-
-
-@pytest.fixture
-def async_session_maker(async_engine):
-    """Create async session factory for edge endpoints."""
-    return async_sessionmaker(
-        async_engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-    )
-
-
-@pytest.fixture
-def edges_app(async_session_maker) -> FastAPI:
-    """Create a test FastAPI app with edges router."""
+@pytest.fixture(scope="module")
+def async_app() -> FastAPI:
+    """Create a test FastAPI app with the edges router."""
     app = FastAPI()
     app.include_router(edges_router)
-
-    async def override_get_async_db():
-        async with async_session_maker() as session:
-            yield session
-
-    app.dependency_overrides[get_async_db] = override_get_async_db
-    yield app
-    app.dependency_overrides.clear()
-
-
-@pytest.fixture
-def client(edges_app: FastAPI) -> testclient.TestClient:
-    """Create test client for edge endpoints."""
-    return testclient.TestClient(edges_app)
-
-
-def create_canvas(sync_session_local, name: str = "Test Canvas") -> int:
-    """Create a canvas and return its ID."""
-    with sync_session_local() as session:
-        canvas = Canvas(user_id="default_user", name=name)
-        session.add(canvas)
-        session.commit()
-        session.refresh(canvas)
-        return canvas.id
+    return app
 
 
 def create_canvas_with_nodes(
-    sync_session_local,
+    sync_engine,
     name: str = "Test Canvas",
     node_count: int = 2,
 ) -> tuple[int, list[int]]:
     """Create a canvas with nodes and return IDs."""
-    with sync_session_local() as session:
-        canvas = Canvas(user_id="default_user", name=name)
-        session.add(canvas)
-        session.commit()
-        session.refresh(canvas)
+    with sync_engine.begin() as connection:
+        canvas_id = connection.execute(
+            insert(Canvas).values(user_id="default_user", name=name).returning(Canvas.id)
+        ).scalar_one()
+        node_ids = connection.execute(
+            insert(Node).returning(Node.id, sort_by_parameter_order=True),
+            [
+                {
+                    "canvas_id": canvas_id,
+                    "type": NodeType.TEXT,
+                    "label": f"Node {index + 1}",
+                    "position": '{"x": 0, "y": 0, "z": 0}',
+                }
+                for index in range(node_count)
+            ],
+        ).scalars().all()
+    return canvas_id, list(node_ids)
+
+
+@pytest.fixture(scope="module")
+def seeded_graph(sync_engine) -> tuple[int, list[int]]:
+    """Create the canvas with three nodes that edge tests connect."""
+    return create_canvas_with_nodes(sync_engine, node_count=3)
+
+
+@pytest.fixture(scope="module")
+def other_graph(sync_engine) -> tuple[int, list[int]]:
+    """Create a second canvas with two nodes for cross-canvas checks."""
+    return create_canvas_with_nodes(sync_engine, name="Other Canvas")
+
+
+@pytest.fixture(scope="module")
+def listed_graph(sync_engine, other_graph) -> tuple[int, list[int]]:
+    """Create a canvas with a two-edge chain plus one edge on the other canvas.
+
+    The edges are module-scoped, so listing tests share them read-only.
+    """
+    canvas_id, node_ids = create_canvas_with_nodes(
+        sync_engine, name="Listing Canvas", node_count=3
+    )
+    other_canvas_id, other_node_ids = other_graph
+    with sync_engine.begin() as connection:
+        connection.execute(
+            insert(Edge),
+            [
+                {
+                    "canvas_id": canvas_id,
+                    "from_node_id": node_ids[0],
+                    "to_node_id": node_ids[1],
+                    "relation_type": "depends_on",
+                },
+                {
+                    "canvas_id": canvas_id,
+                    "from_node_id": node_ids[1],
+                    "to_node_id": node_ids[2],
+                    "relation_type": "references",
+                },
+                {
+                    "canvas_id": other_canvas_id,
+                    "from_node_id": other_node_ids[0],
+                    "to_node_id": other_node_ids[1],
+                    "relation_type": "supports",
+                },
+            ],
+        )
+    return canvas_id, node_ids
 
-        nodes: list[Node] = []
-        for index in range(node_count):
-            node = Node(
-                canvas_id=canvas.id,
-                type=NodeType.TEXT,
-                label=f"Node {index + 1}",
-                position='{"x": 0, "y": 0, "z": 0}',
-            )
-            session.add(node)
-            nodes.append(node)
 
-        session.commit()
-        for node in nodes:
-            session.refresh(node)
+@pytest.fixture(autouse=True)
+def _clear_edges(sync_engine) -> Iterator[None]:
+    """Delete the edges a test wrote, keeping the seeded graphs.
 
-        return canvas.id, [node.id for node in nodes]
+    Setup data goes through the sync engine and endpoints through the async
+    one, so the two never share a transaction that could be rolled back.
+    Only edges newer than the test's start are removed, which leaves the
+    module-scoped ``listed_graph`` edges in place.
+    """
+    with sync_engine.connect() as connection:
+        last_seeded_id = connection.execute(select(func.max(Edge.id))).scalar() or 0
+    yield
+    with sync_engine.begin() as connection:
+        connection.execute(delete(Edge).where(Edge.id > last_seeded_id))
 
 
 class TestEdgeEndpoints:
     """Test suite for edge API endpoints."""
 
-    def test_create_and_get_edge(
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_create_and_get_edge(
         self,
-        client: testclient.TestClient,
-        sync_session_local,
+        async_client: httpx.AsyncClient,
+        seeded_graph: tuple[int, list[int]],
     ) -> None:
         """Test creating an edge and retrieving it by ID."""
-        canvas_id, node_ids = create_canvas_with_nodes(sync_session_local)
+        canvas_id, node_ids = seeded_graph
         payload = {
             "canvas_id": canvas_id,
             "from_node_id": node_ids[0],
             "to_node_id": node_ids[1],
             "relation_type": "depends_on",
         }
-        response = client.post("/api/edges", json=payload)
+        response = await async_client.post("/api/edges", json=payload)
         assert response.status_code == 201
         data = response.json()
         assert data["canvas_id"] == canvas_id
@@ -152,20 +142,21 @@ class TestEdgeEndpoints:
         assert "created_at" in data
 
         edge_id = data["id"]
-        get_response = client.get(f"/api/edges/{edge_id}")
+        get_response = await async_client.get(f"/api/edges/{edge_id}")
         assert get_response.status_code == 200
         get_data = get_response.json()
         assert get_data["id"] == edge_id
         assert get_data["canvas_id"] == canvas_id
 
-    def test_update_edge_relation_type(
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_update_edge_relation_type(
         self,
-        client: testclient.TestClient,
-        sync_session_local,
+        async_client: httpx.AsyncClient,
+        seeded_graph: tuple[int, list[int]],
     ) -> None:
         """Test updating edge relation type."""
-        canvas_id, node_ids = create_canvas_with_nodes(sync_session_local)
-        create_response = client.post(
+        canvas_id, node_ids = seeded_graph
+        create_response = await async_client.post(
             "/api/edges",
             json={
                 "canvas_id": canvas_id,
@@ -177,10 +168,10 @@ class TestEdgeEndpoints:
         assert create_response.status_code == 201
         edge_id = create_response.json()["id"]
 
-        empty_update = client.put(f"/api/edges/{edge_id}", json={})
+        empty_update = await async_client.put(f"/api/edges/{edge_id}", json={})
         assert empty_update.status_code == 400
 
-        update_response = client.put(
+        update_response = await async_client.put(
             f"/api/edges/{edge_id}",
             json={"relation_type": "conflicts"},
         )
@@ -188,19 +179,60 @@ class TestEdgeEndpoints:
         updated = update_response.json()
         assert updated["relation_type"] == "conflicts"
 
-    def test_list_and_delete_edges(
+    @pytest.mark.parametrize(
+        ("query", "expected_count", "matches"),
+        [
+            pytest.param(
+                lambda canvas_id, node_ids: f"canvas_id={canvas_id}",
+                2,
+                lambda edge, canvas_id, node_ids: edge["canvas_id"] == canvas_id,
+                id="by-canvas",
+            ),
+            pytest.param(
+                lambda canvas_id, node_ids: (
+                    f"node_id={node_ids[1]}&as_source=true&as_target=false"
+                ),
+                1,
+                lambda edge, canvas_id, node_ids: edge["from_node_id"] == node_ids[1],
+                id="outgoing",
+            ),
+            pytest.param(
+                lambda canvas_id, node_ids: (
+                    f"node_id={node_ids[1]}&as_source=false&as_target=true"
+                ),
+                1,
+                lambda edge, canvas_id, node_ids: edge["to_node_id"] == node_ids[1],
+                id="incoming",
+            ),
+        ],
+    )
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_list_edges(
         self,
-        client: testclient.TestClient,
-        sync_session_local,
+        async_client: httpx.AsyncClient,
+        listed_graph: tuple[int, list[int]],
+        query,
+        expected_count: int,
+        matches,
     ) -> None:
-        """Test listing edges with filters and deleting an edge."""
-        canvas_id, node_ids = create_canvas_with_nodes(sync_session_local, node_count=3)
-        other_canvas_id, other_node_ids = create_canvas_with_nodes(
-            sync_session_local,
-            name="Other Canvas",
-        )
+        """Test listing edges with canvas and node-direction filters."""
+        canvas_id, node_ids = listed_graph
+
+        response = await async_client.get(f"/api/edges?{query(canvas_id, node_ids)}")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == expected_count
+        assert all(matches(edge, canvas_id, node_ids) for edge in data["edges"])
 
-        edge_a = client.post(
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_delete_edge(
+        self,
+        async_client: httpx.AsyncClient,
+        seeded_graph: tuple[int, list[int]],
+    ) -> None:
+        """Test deleting an edge makes it unreachable."""
+        canvas_id, node_ids = seeded_graph
+        create_response = await async_client.post(
             "/api/edges",
             json={
                 "canvas_id": canvas_id,
@@ -209,69 +241,27 @@ class TestEdgeEndpoints:
                 "relation_type": "depends_on",
             },
         )
-        assert edge_a.status_code == 201
-
-        edge_b = client.post(
-            "/api/edges",
-            json={
-                "canvas_id": canvas_id,
-                "from_node_id": node_ids[1],
-                "to_node_id": node_ids[2],
-                "relation_type": "references",
-            },
-        )
-        assert edge_b.status_code == 201
-
-        other_edge = client.post(
-            "/api/edges",
-            json={
-                "canvas_id": other_canvas_id,
-                "from_node_id": other_node_ids[0],
-                "to_node_id": other_node_ids[1],
-                "relation_type": "supports",
-            },
-        )
-        assert other_edge.status_code == 201
-
-        list_response = client.get(f"/api/edges?canvas_id={canvas_id}")
-        assert list_response.status_code == 200
-        list_data = list_response.json()
-        assert list_data["count"] == 2
-        assert all(edge["canvas_id"] == canvas_id for edge in list_data["edges"])
-
-        outgoing = client.get(
-            f"/api/edges?node_id={node_ids[1]}&as_source=true&as_target=false"
-        )
-        assert outgoing.status_code == 200
-        outgoing_data = outgoing.json()
-        assert outgoing_data["count"] == 1
-        assert outgoing_data["edges"][0]["from_node_id"] == node_ids[1]
-
-        incoming = client.get(
-            f"/api/edges?node_id={node_ids[1]}&as_source=false&as_target=true"
-        )
-        assert incoming.status_code == 200
-        incoming_data = incoming.json()
-        assert incoming_data["count"] == 1
-        assert incoming_data["edges"][0]["to_node_id"] == node_ids[1]
+        assert create_response.status_code == 201
+        edge_id = create_response.json()["id"]
 
-        edge_id = list_data["edges"][0]["id"]
-        delete_response = client.delete(f"/api/edges/{edge_id}")
+        delete_response = await async_client.delete(f"/api/edges/{edge_id}")
         assert delete_response.status_code == 204
 
-        get_response = client.get(f"/api/edges/{edge_id}")
+        get_response = await async_client.get(f"/api/edges/{edge_id}")
         assert get_response.status_code == 404
 
-    def test_create_edge_canvas_mismatch(
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_create_edge_canvas_mismatch(
         self,
-        client: testclient.TestClient,
-        sync_session_local,
+        async_client: httpx.AsyncClient,
+        seeded_graph: tuple[int, list[int]],
+        other_graph: tuple[int, list[int]],
     ) -> None:
         """Test creating an edge with nodes outside the canvas fails."""
-        canvas_id, node_ids = create_canvas_with_nodes(sync_session_local)
-        other_canvas_id = create_canvas(sync_session_local, name="Other Canvas")
+        _, node_ids = seeded_graph
+        other_canvas_id, _ = other_graph
 
-        response = client.post(
+        response = await async_client.post(
             "/api/edges",
             json={
                 "canvas_id": other_canvas_id,
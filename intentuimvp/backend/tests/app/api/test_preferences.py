@@ -1,63 +1,33 @@
 """Integration tests for preferences API endpoints."""
 
-import tempfile
+from collections.abc import Callable
 
 import pytest
-from fastapi import testclient
-from sqlalchemy import create_engine
+from fastapi import FastAPI, testclient
 from sqlalchemy.orm import sessionmaker
 
 # Import models to register them with Base
 import app.models.canvas  # noqa: F401 - Side-effect import to register models
 import app.models.preferences  # noqa: F401 - Side-effect import to register models
 from app.api.preferences import router as preferences_router
-from app.database import Base, get_db
 
 
-@pytest.fixture
-def test_db_file():
-    """Create temporary file for test database."""
-    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
-        yield f.name
-
-
-@pytest.fixture
-def test_engine(test_db_file):
-    """Create test database engine."""
-    test_database_url = f"sqlite:///{test_db_file}"
-    engine = create_engine(
-        test_database_url,
-        connect_args={"check_same_thread": False},
-    )
-    Base.metadata.create_all(bind=engine)
-    yield engine
-
-
-@pytest.fixture
-def preferences_app(test_engine):
-    """Create a test FastAPI app with preferences router."""
-    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
-
-    def override_get_db():
-        db = testing_session_local()
-        try:
-            yield db
-        finally:
-            db.close()
-
-    from fastapi import FastAPI
-
+@pytest.fixture(scope="session")
+def preferences_app() -> FastAPI:
+    """Create one test FastAPI app with preferences router for the session."""
     app = FastAPI()
     app.include_router(preferences_router)
-    app.dependency_overrides[get_db] = override_get_db
-    yield app
-    app.dependency_overrides.clear()
+    return app
 
 
 @pytest.fixture
-def client(preferences_app) -> testclient.TestClient:
-    """Create test client for preferences endpoints."""
-    return testclient.TestClient(preferences_app)
+def client(
+    preferences_app: FastAPI,
+    testing_session_local: sessionmaker,
+    db_client: Callable[[FastAPI, sessionmaker], testclient.TestClient],
+) -> testclient.TestClient:
+    """Return the preferences client with ``get_db`` bound to this test's database."""
+    return db_client(preferences_app, testing_session_local)
 
 
 class TestPreferencesEndpoint:
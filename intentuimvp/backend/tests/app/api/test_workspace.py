@@ -1,63 +1,33 @@
 """Integration tests for workspace API endpoints."""
 
-import tempfile
+from collections.abc import Callable
 
 import pytest
-from fastapi import testclient
-from sqlalchemy import create_engine
+from fastapi import FastAPI, testclient
 from sqlalchemy.orm import sessionmaker
 
 from app.api.workspace import router as workspace_router
-from app.database import Base, get_db
 from app.models.canvas import Canvas
 from app.models.edge import Edge, RelationType
 from app.models.node import Node, NodeType
 
 
-@pytest.fixture
-def test_db_file():
-    """Create temporary file for test database."""
-    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
-        yield f.name
-
-
-@pytest.fixture
-def test_engine(test_db_file):
-    """Create test database engine."""
-    test_database_url = f"sqlite:///{test_db_file}"
-    engine = create_engine(
-        test_database_url,
-        connect_args={"check_same_thread": False},
-    )
-    Base.metadata.create_all(bind=engine)
-    yield engine
-
-
-@pytest.fixture
-def workspace_app(test_engine):
-    """Create a test FastAPI app with workspace router."""
-    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
-
-    def override_get_db():
-        db = testing_session_local()
-        try:
-            yield db
-        finally:
-            db.close()
-
-    from fastapi import FastAPI
-
+@pytest.fixture(scope="session")
+def workspace_app() -> FastAPI:
+    """Create one test FastAPI app with workspace router for the session."""
     app = FastAPI()
     app.include_router(workspace_router)
-    app.dependency_overrides[get_db] = override_get_db
-    yield app
-    app.dependency_overrides.clear()
+    return app
 
 
 @pytest.fixture
-def client(workspace_app) -> testclient.TestClient:
-    """Create test client for workspace endpoints."""
-    return testclient.TestClient(workspace_app)
+def client(
+    workspace_app: FastAPI,
+    testing_session_local: sessionmaker,
+    db_client: Callable[[FastAPI, sessionmaker], testclient.TestClient],
+) -> testclient.TestClient:
+    """Return the workspace client with ``get_db`` bound to this test's database."""
+    return db_client(workspace_app, testing_session_local)
 
 
 class TestWorkspaceEndpoint:
@@ -74,16 +44,14 @@ class TestWorkspaceEndpoint:
     def test_get_workspace_includes_edges(
         self,
         client: testclient.TestClient,
-        test_engine,
+        testing_session_local: sessionmaker,
     ) -> None:
         """Test GET /api/workspace includes persisted edges."""
-        test_session_local = sessionmaker(bind=test_engine)
-        db = test_session_local()
+        db = testing_session_local()
         try:
             canvas = Canvas(user_id="default_user", name="edge_test")
             db.add(canvas)
-            db.commit()
-            db.refresh(canvas)
+            db.flush()
 
             node1 = Node(
                 canvas_id=canvas.id,
@@ -98,9 +66,7 @@ class TestWorkspaceEndpoint:
                 position='{"x": 30, "y": 40, "z": 0}',
             )
             db.add_all([node1, node2])
-            db.commit()
-            db.refresh(node1)
-            db.refresh(node2)
+            db.flush()
             node1_id = node1.id
             node2_id = node2.id
 
@@ -125,16 +91,14 @@ class TestWorkspaceEndpoint:
     def test_get_workspace_corrupted_state_returns_blank(
         self,
         client: testclient.TestClient,
-        test_engine,
+        testing_session_local: sessionmaker,
     ) -> None:
         """Test GET /api/workspace returns blank state on corrupted data."""
-        test_session_local = sessionmaker(bind=test_engine)
-        db = test_session_local()
+        db = testing_session_local()
         try:
             canvas = Canvas(user_id="default_user", name="corrupt_test")
             db.add(canvas)
-            db.commit()
-            db.refresh(canvas)
+            db.flush()
 
             node = Node(
                 canvas_id=canvas.id,
@@ -448,6 +448,43 @@ class TestEdgeRepository:
         all_edges = await edge_repo.get_by_node(node1.id, as_source=True, as_target=True)
         assert len(all_edges) == 2
 
+    async def test_get_by_nodes(self, async_db: AsyncSession) -> None:
+        """Test getting edges touching several nodes at once."""
+        canvas_repo = CanvasRepository(async_db)
+        node_repo = NodeRepository(async_db)
+        edge_repo = EdgeRepository(async_db)
+
+        canvas = await canvas_repo.create_canvas(user_id="test_user", name="Test")
+        node1 = await node_repo.create_node(canvas_id=canvas.id, label="Node 1")
+        node2 = await node_repo.create_node(canvas_id=canvas.id, label="Node 2")
+        node3 = await node_repo.create_node(canvas_id=canvas.id, label="Node 3")
+        node4 = await node_repo.create_node(canvas_id=canvas.id, label="Node 4")
+
+        # Create edges: node1 -> node2, node2 -> node3, node3 -> node4
+        first = await edge_repo.create_edge(
+            canvas_id=canvas.id,
+            from_node_id=node1.id,
+            to_node_id=node2.id,
+            relation_type=RelationType.DEPENDS_ON,
+        )
+        second = await edge_repo.create_edge(
+            canvas_id=canvas.id,
+            from_node_id=node2.id,
+            to_node_id=node3.id,
+            relation_type=RelationType.REFERENCES,
+        )
+        await edge_repo.create_edge(
+            canvas_id=canvas.id,
+            from_node_id=node3.id,
+            to_node_id=node4.id,
+            relation_type=RelationType.SUPPORTS,
+        )
+
+        edges = await edge_repo.get_by_nodes([node1.id, node2.id])
+        assert [edge.id for edge in edges] == [first.id, second.id]
+
+        assert await edge_repo.get_by_nodes([]) == []
+
     async def test_update_relation_type(self, async_db: AsyncSession) -> None:
         """Test updating edge relation type."""
         canvas_repo = CanvasRepository(async_db)
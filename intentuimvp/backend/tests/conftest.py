@@ -7,11 +7,24 @@ from pathlib import Path
 from uuid import uuid4
 
 DEFAULT_TEST_DB_PATH = Path(tempfile.gettempdir()) / f"intentui_test_{uuid4().hex}.db"
-DEFAULT_TEST_DB_URL = f"sqlite:///{DEFAULT_TEST_DB_PATH}"
+if os.environ.get("PYTEST_IN_MEMORY") == "1":
+    # Shared-cache in-memory database so the sync and async engines see the
+    # same schema; both engines hold it open through a StaticPool.
+    DEFAULT_TEST_DB_URL = (
+        f"sqlite:///file:intentui_test_{uuid4().hex}?mode=memory&cache=shared&uri=true"
+    )
+else:
+    DEFAULT_TEST_DB_URL = f"sqlite:///{DEFAULT_TEST_DB_PATH}"
+if os.environ.get("PYTEST_XDIST_WORKER") and os.environ.get("INTENTUI_TEST_DATABASE_DEFAULTED"):
+    # pytest-xdist workers inherit the controller's default database; give each
+    # worker its own so one worker's teardown cannot delete another's file.
+    os.environ["INTENTUI_TEST_DATABASE_URL"] = DEFAULT_TEST_DB_URL
+if "INTENTUI_TEST_DATABASE_URL" not in os.environ:
+    os.environ["INTENTUI_TEST_DATABASE_DEFAULTED"] = "1"
 TEST_DB_URL = os.environ.setdefault("INTENTUI_TEST_DATABASE_URL", DEFAULT_TEST_DB_URL)
 TEST_DB_PATH = (
     Path(TEST_DB_URL.replace("sqlite:///", "", 1))
-    if TEST_DB_URL.startswith("sqlite:///")
+    if TEST_DB_URL.startswith("sqlite:///") and "mode=memory" not in TEST_DB_URL
     else None
 )
 os.environ.setdefault("PYDANTIC_GATEWAY_API_KEY", "test-key")